@@ -0,0 +1,388 @@
+"""
+An in-process stand-in for the parts of a UFDL server used by the plugin, for
+benchmarking without a real backend. Installing the mock replaces the Python
+client's functional API (the dataset, team, project and licence functions the
+plugin calls) with methods operating on in-memory datasets, with configurable
+per-request latency and transfer bandwidth.
+"""
+import importlib
+import threading
+import time
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+# The chunk size files are streamed from the mock server in
+CHUNK_SIZE: int = 64 * 1024
+
+# The functional-API modules which contain dataset functions
+DATASET_MODULES: Tuple[str, ...] = (
+    "ufdl.pythonclient.functional.core.dataset",
+    "ufdl.pythonclient.functional.image_classification.dataset",
+    "ufdl.pythonclient.functional.object_detection.dataset",
+    "ufdl.pythonclient.functional.speech.dataset",
+    "ufdl.pythonclient.functional.spectrum_classification.dataset",
+)
+
+
+class MockDataset:
+    """
+    A dataset held by the mock server.
+    """
+    def __init__(self, pk: int, name: str, project: int, version: int):
+        self.pk: int = pk
+        self.name: str = name
+        self.project: int = project
+        self.version: int = version
+        self.files: Dict[str, bytes] = {}
+        self.categories: Dict[str, List[str]] = {}
+        self.transcriptions: Dict[str, str] = {}
+        self.file_types: Dict[str, Dict[str, Any]] = {}
+        self.annotations: Dict[str, List[Any]] = {}
+
+    def copy(self, pk: int, name: str, version: int) -> 'MockDataset':
+        copy = MockDataset(pk, name, self.project, version)
+        copy.files = dict(self.files)
+        copy.categories = {filename: list(categories) for filename, categories in self.categories.items()}
+        copy.transcriptions = dict(self.transcriptions)
+        copy.file_types = dict(self.file_types)
+        copy.annotations = {filename: list(annotations) for filename, annotations in self.annotations.items()}
+        return copy
+
+
+class MockServerContext:
+    """
+    Replaces the server context, so no connection is attempted.
+    """
+    def __init__(self, host: str, username: str, password: str):
+        self.host = host
+        self.username = username
+
+
+class MockUFDLServer:
+    """
+    In-memory UFDL server with injected latency and bandwidth limits.
+    """
+    def __init__(self, latency: float = 0.0, bandwidth: Optional[float] = None):
+        """
+        :param latency:     The delay added to every request, in seconds.
+        :param bandwidth:   The transfer rate of file contents, in bytes per second,
+                            or None for unlimited.
+        """
+        self.latency: float = latency
+        self.bandwidth: Optional[float] = bandwidth
+        self._lock = threading.Lock()
+        self._datasets: Dict[int, MockDataset] = {}
+        self._next_pk: int = 1
+        self._originals: List[Tuple[Any, str, Any]] = []
+
+        # Request counts per operation, and file bytes transferred in each direction
+        self.request_counts: Dict[str, int] = {}
+        self.bytes_downloaded: int = 0
+        self.bytes_uploaded: int = 0
+
+    def install(self) -> 'MockUFDLServer':
+        """
+        Replaces the Python client's functional API with this mock server.
+
+        :return:    This server.
+        """
+        for module_name in DATASET_MODULES:
+            module = importlib.import_module(module_name)
+            for name, function in (
+                    ("list", self.list_datasets),
+                    ("retrieve", self.retrieve),
+                    ("create", self.create),
+                    ("copy", self.copy),
+                    ("get_file", self.get_file),
+                    ("add_file", self.add_file),
+                    ("delete_file", self.delete_file),
+                    ("get_categories", self.get_categories),
+                    ("add_categories", self.add_categories),
+                    ("get_transcriptions", self.get_transcriptions),
+                    ("set_transcription_for_file", self.set_transcription_for_file),
+                    ("get_annotations", self.get_annotations),
+                    ("get_file_type", self.get_file_type),
+                    ("set_file_type", self.set_file_type),
+                    ("get_annotations_for_file", self.get_annotations_for_file),
+                    ("set_annotations_for_file", self.set_annotations_for_file),
+            ):
+                self._replace(module, name, function)
+
+        for module_name in (
+                "ufdl.pythonclient.functional.core.team",
+                "ufdl.pythonclient.functional.core.project",
+                "ufdl.pythonclient.functional.core.licence",
+        ):
+            self._replace(importlib.import_module(module_name), "list", self.list_named)
+
+        self._replace(
+            importlib.import_module("ufdl.annotations_plugin.common.util._get_server_context"),
+            "UFDLServerContext",
+            MockServerContext
+        )
+
+        return self
+
+    def uninstall(self):
+        """
+        Restores the Python client's functional API.
+        """
+        for module, name, original in reversed(self._originals):
+            setattr(module, name, original)
+        self._originals.clear()
+
+    def _replace(self, module: Any, name: str, replacement: Any):
+        self._originals.append((module, name, getattr(module, name, None)))
+        setattr(module, name, replacement)
+
+    def add_dataset(self, name: str, project: int = 1) -> MockDataset:
+        """
+        Creates an empty dataset directly, for seeding benchmarks.
+
+        :param name:        The name of the dataset.
+        :param project:     The primary key of the project it belongs to.
+        :return:            The dataset.
+        """
+        with self._lock:
+            dataset = MockDataset(self._next_pk, name, project, self._next_version(name))
+            self._datasets[dataset.pk] = dataset
+            self._next_pk += 1
+            return dataset
+
+    def find_dataset(self, name: str) -> Optional[MockDataset]:
+        """
+        Gets the latest version of a dataset by name.
+
+        :param name:    The name of the dataset.
+        :return:        The dataset, or None if there is no such dataset.
+        """
+        with self._lock:
+            matching = [dataset for dataset in self._datasets.values() if dataset.name == name]
+
+        return max(matching, key=lambda dataset: dataset.version) if len(matching) > 0 else None
+
+    def list_named(self, context, filter_spec=None) -> List[Dict[str, Any]]:
+        # Every team, project and licence exists, with primary key 1
+        self._request("list_named")
+        return [{"pk": 1}]
+
+    def list_datasets(self, context, filter_spec=None) -> List[Dict[str, Any]]:
+        self._request("list")
+
+        fields = _filter_fields(filter_spec)
+
+        with self._lock:
+            datasets = [
+                dataset
+                for dataset in self._datasets.values()
+                if all(getattr(dataset, field, None) == value for field, value in fields.items())
+            ]
+
+        datasets.sort(key=lambda dataset: dataset.version, reverse=True)
+
+        return [self._dataset_json(dataset) for dataset in datasets]
+
+    def retrieve(self, context, pk: int) -> Dict[str, Any]:
+        self._request("retrieve")
+        return self._dataset_json(self._get(pk))
+
+    def create(self, context, name, project, licence, description="", is_public=False, tags="") -> Dict[str, Any]:
+        self._request("create")
+        dataset = self.add_dataset(name, project)
+        return self._dataset_json(dataset)
+
+    def copy(self, context, pk: int, new_name: Optional[str] = None) -> Dict[str, Any]:
+        self._request("copy")
+
+        source = self._get(pk)
+        name = source.name if new_name is None else new_name
+
+        with self._lock:
+            dataset = source.copy(self._next_pk, name, self._next_version(name))
+            self._datasets[dataset.pk] = dataset
+            self._next_pk += 1
+
+        return self._dataset_json(dataset)
+
+    def get_file(self, context, pk: int, filename: str) -> Iterator[bytes]:
+        self._request("get_file")
+
+        data = self._get(pk).files[filename]
+
+        for offset in range(0, max(len(data), 1), CHUNK_SIZE):
+            chunk = data[offset:offset + CHUNK_SIZE]
+            self._transfer(len(chunk))
+            with self._lock:
+                self.bytes_downloaded += len(chunk)
+            yield chunk
+
+    def add_file(self, context, pk: int, filename: str, data: Union[bytes, BinaryIO]) -> Dict[str, Any]:
+        self._request("add_file")
+
+        # Files can be uploaded from open file objects as well as from memory
+        if hasattr(data, "read"):
+            data = data.read()
+
+        self._transfer(len(data))
+
+        dataset = self._get(pk)
+        with self._lock:
+            self.bytes_uploaded += len(data)
+            dataset.files[filename] = bytes(data)
+
+        return self._dataset_json(dataset)
+
+    def delete_file(self, context, pk: int, filename: str) -> Dict[str, Any]:
+        self._request("delete_file")
+
+        dataset = self._get(pk)
+        with self._lock:
+            dataset.files.pop(filename)
+            dataset.categories.pop(filename, None)
+            dataset.transcriptions.pop(filename, None)
+            dataset.file_types.pop(filename, None)
+            dataset.annotations.pop(filename, None)
+
+        return self._dataset_json(dataset)
+
+    def get_categories(self, context, pk: int) -> Dict[str, List[str]]:
+        self._request("get_categories")
+
+        dataset = self._get(pk)
+        with self._lock:
+            return {filename: list(categories) for filename, categories in dataset.categories.items()}
+
+    def add_categories(self, context, pk: int, filenames: List[str], categories: List[str]) -> Dict[str, List[str]]:
+        self._request("add_categories")
+
+        dataset = self._get(pk)
+        with self._lock:
+            for filename in filenames:
+                file_categories = dataset.categories.setdefault(filename, [])
+                file_categories.extend(category for category in categories if category not in file_categories)
+
+        return self.get_categories(context, pk)
+
+    def get_transcriptions(self, context, pk: int) -> Dict[str, Dict[str, str]]:
+        self._request("get_transcriptions")
+
+        dataset = self._get(pk)
+        with self._lock:
+            return {
+                filename: {"transcription": transcription}
+                for filename, transcription in dataset.transcriptions.items()
+            }
+
+    def set_transcription_for_file(self, context, pk: int, filename: str, transcription: str):
+        self._request("set_transcription_for_file")
+
+        dataset = self._get(pk)
+        with self._lock:
+            dataset.transcriptions[filename] = transcription
+
+    def get_annotations(self, context, pk: int) -> Dict[str, Dict[str, Any]]:
+        self._request("get_annotations")
+
+        dataset = self._get(pk)
+        with self._lock:
+            return {
+                filename: {**file_type, "annotations": list(dataset.annotations.get(filename, []))}
+                for filename, file_type in dataset.file_types.items()
+            }
+
+    def get_file_type(self, context, pk: int, filename: str) -> Dict[str, Any]:
+        self._request("get_file_type")
+        return dict(self._get(pk).file_types[filename])
+
+    def set_file_type(self, context, pk: int, filename: str, format: str, width: int, height: int, length=None):
+        self._request("set_file_type")
+
+        file_type = {"format": format, "dimensions": [width, height]}
+        if length is not None:
+            file_type["length"] = length
+
+        dataset = self._get(pk)
+        with self._lock:
+            dataset.file_types[filename] = file_type
+
+    def get_annotations_for_file(self, context, pk: int, filename: str) -> List[Any]:
+        self._request("get_annotations_for_file")
+
+        dataset = self._get(pk)
+        with self._lock:
+            return list(dataset.annotations.get(filename, []))
+
+    def set_annotations_for_file(self, context, pk: int, filename: str, annotations: List[Any]):
+        self._request("set_annotations_for_file")
+
+        dataset = self._get(pk)
+        raw_annotations = [
+            annotation.to_raw_json() if hasattr(annotation, "to_raw_json") else annotation
+            for annotation in annotations
+        ]
+        with self._lock:
+            dataset.annotations[filename] = raw_annotations
+
+    def _request(self, operation: str):
+        """
+        Simulates the round-trip of a request.
+        """
+        with self._lock:
+            self.request_counts[operation] = self.request_counts.get(operation, 0) + 1
+
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def _transfer(self, num_bytes: int):
+        """
+        Simulates the transfer time of file contents.
+        """
+        if self.bandwidth is not None and num_bytes > 0:
+            time.sleep(num_bytes / self.bandwidth)
+
+    def _get(self, pk: int) -> MockDataset:
+        with self._lock:
+            return self._datasets[pk]
+
+    def _next_version(self, name: str) -> int:
+        # Must be called with the lock held
+        return 1 + max((dataset.version for dataset in self._datasets.values() if dataset.name == name), default=0)
+
+    def _dataset_json(self, dataset: MockDataset) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pk": dataset.pk,
+                "name": dataset.name,
+                "project": dataset.project,
+                "version": dataset.version,
+                "files": list(dataset.files)
+            }
+
+
+def _filter_fields(filter_spec) -> Dict[str, Any]:
+    """
+    Gets the field values required by a filter. The plugin only filters
+    on conjunctions of exact matches, so any field/value pairs found are
+    treated as such.
+
+    :param filter_spec:     The filter specification.
+    :return:                The required value of each filtered field.
+    """
+    fields: Dict[str, Any] = {}
+
+    if filter_spec is None:
+        return fields
+
+    def walk(raw):
+        if isinstance(raw, dict):
+            if "field" in raw and "value" in raw:
+                fields[raw["field"]] = raw["value"]
+            for value in raw.values():
+                walk(value)
+        elif isinstance(raw, list):
+            for value in raw:
+                walk(value)
+
+    walk(filter_spec.to_raw_json())
+
+    return fields
+
@@ -0,0 +1,248 @@
+"""
+Measures the throughput of the plugin's readers and writers against the mock
+UFDL server. Each benchmark seeds a source dataset on the mock server, then
+runs a wai.annotations conversion from it (with a from-ufdl-* reader) into a new
+dataset (with the matching to-ufdl-* writer), and reports files/sec and MB/sec.
+
+Example:
+
+    python benchmarks/run_benchmarks.py --domains ic od --sizes 100 1000 \\
+        --latency 20 --bandwidth 50 --reader-args="--download-workers 8"
+
+The od-video domain converts object-detection datasets of short videos, whose
+frames are extracted by the reader and re-assembled into videos by the writer,
+to measure video decoding (e.g. with --reader-args="--video-decode-workers 4").
+"""
+import argparse
+import io
+import os
+import shlex
+import tempfile
+import time
+import wave
+from typing import Callable, Dict, List, Tuple
+
+from wai.annotations.main import main as wai_annotations_main
+
+from mock_ufdl import MockDataset, MockUFDLServer
+
+# The length (in seconds), frame-rate and labelled frame-times of benchmark videos
+VIDEO_LENGTH: float = 2.0
+VIDEO_FPS: int = 10
+VIDEO_LABELLED_TIMES: List[float] = [0.0, 0.5, 1.0, 1.5]
+
+# The connection options, accepted by the mock server
+SERVER_OPTIONS: List[str] = [
+    "-h", "http://mock-ufdl",
+    "-u", "benchmark",
+    "-w", "benchmark",
+    "--team", "benchmark",
+    "--project", "benchmark"
+]
+
+
+def make_image(index: int, size: int) -> bytes:
+    """
+    Creates a JPEG image of roughly the given size in bytes.
+    """
+    from PIL import Image
+
+    side = max(int((size / 3) ** 0.5), 8)
+    image = Image.frombytes("RGB", (side, side), os.urandom(side * side * 3))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=95)
+    return buffer.getvalue()
+
+
+def make_audio(index: int, size: int) -> bytes:
+    """
+    Creates a WAV file of roughly the given size in bytes.
+    """
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(os.urandom(max(size // 2, 1) * 2))
+    return buffer.getvalue()
+
+
+def make_spectrum(index: int, size: int) -> bytes:
+    """
+    Creates an ADAMS spectrum file of roughly the given size in bytes.
+    """
+    lines = ["waveno,amplitude"]
+    num_points = max(size // 16, 1)
+    lines.extend(f"{400.0 + point:.1f},{(index * 31 + point) % 1000 / 1000:.4f}" for point in range(num_points))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def make_video(index: int, size: int) -> bytes:
+    """
+    Creates an MP4 video of random frames, of VIDEO_LENGTH seconds at VIDEO_FPS,
+    with frames of roughly the given size in bytes.
+    """
+    import numpy as np
+    from moviepy.video.VideoClip import VideoClip
+
+    # H.264 requires even dimensions
+    side = max(int((size / 3) ** 0.5) // 2 * 2, 16)
+    random = np.random.RandomState(index)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "video.mp4")
+        clip = VideoClip(lambda t: random.randint(0, 256, (side, side, 3), dtype=np.uint8), duration=VIDEO_LENGTH)
+        clip.write_videofile(path, fps=VIDEO_FPS, codec="libx264", audio=False, logger=None)
+        with open(path, "rb") as file:
+            return file.read()
+
+
+def seed_ic(dataset: MockDataset, num_files: int, file_size: int):
+    for index in range(num_files):
+        filename = f"image-{index}.jpg"
+        dataset.files[filename] = make_image(index, file_size)
+        dataset.categories[filename] = [f"class-{index % 10}"]
+
+
+def seed_od(dataset: MockDataset, num_files: int, file_size: int):
+    for index in range(num_files):
+        filename = f"image-{index}.jpg"
+        data = make_image(index, file_size)
+        side = max(int((file_size / 3) ** 0.5), 8)
+        dataset.files[filename] = data
+        dataset.file_types[filename] = {"format": "jpg", "dimensions": [side, side]}
+        dataset.annotations[filename] = [
+            {"x": 1, "y": 1, "width": side // 2, "height": side // 2, "label": f"object-{index % 5}"}
+        ]
+
+
+def seed_od_video(dataset: MockDataset, num_files: int, file_size: int):
+    for index in range(num_files):
+        filename = f"video-{index}.mp4"
+        side = max(int((file_size / 3) ** 0.5) // 2 * 2, 16)
+        dataset.files[filename] = make_video(index, file_size)
+        dataset.file_types[filename] = {"format": "mp4", "dimensions": [side, side], "length": VIDEO_LENGTH}
+        dataset.annotations[filename] = [
+            {"x": 1, "y": 1, "width": side // 2, "height": side // 2, "label": f"object-{index % 5}", "time": time}
+            for time in VIDEO_LABELLED_TIMES
+        ]
+
+
+def seed_sp(dataset: MockDataset, num_files: int, file_size: int):
+    for index in range(num_files):
+        filename = f"audio-{index}.wav"
+        dataset.files[filename] = make_audio(index, file_size)
+        dataset.transcriptions[filename] = f"transcription number {index}"
+
+
+def seed_sc(dataset: MockDataset, num_files: int, file_size: int):
+    for index in range(num_files):
+        filename = f"spectrum-{index}.spec"
+        dataset.files[filename] = make_spectrum(index, file_size)
+        dataset.categories[filename] = [f"class-{index % 10}"]
+
+
+# The function to seed the source dataset for each domain
+SEEDERS: Dict[str, Callable[[MockDataset, int, int], None]] = {
+    "ic": seed_ic,
+    "od": seed_od,
+    "od-video": seed_od_video,
+    "sp": seed_sp,
+    "sc": seed_sc,
+}
+
+# The plugins to convert each domain with, where not named after the domain
+PLUGINS: Dict[str, str] = {
+    "od-video": "od",
+}
+
+
+def run_benchmark(
+        domain: str,
+        num_files: int,
+        file_size: int,
+        latency: float,
+        bandwidth: float,
+        reader_args: List[str],
+        writer_args: List[str]
+) -> Tuple[float, MockUFDLServer]:
+    """
+    Runs a single conversion between datasets on a fresh mock server.
+
+    :return:    The duration of the conversion in seconds, and the server.
+    """
+    plugin = PLUGINS.get(domain, domain)
+    server = MockUFDLServer(latency, bandwidth).install()
+    try:
+        source = server.add_dataset("source")
+        SEEDERS[domain](source, num_files, file_size)
+
+        with tempfile.TemporaryDirectory() as videos_dir:
+            # The writer re-assembles videos from the originals in a local directory
+            if domain == "od-video":
+                for filename, data in source.files.items():
+                    with open(os.path.join(videos_dir, filename), "wb") as file:
+                        file.write(data)
+                writer_args = ["--videos-dir", videos_dir, *writer_args]
+
+            start = time.perf_counter()
+            wai_annotations_main([
+                "convert",
+                f"from-ufdl-{plugin}", *SERVER_OPTIONS, "--datasets", "name:source", *reader_args,
+                f"to-ufdl-{plugin}", *SERVER_OPTIONS, "--dataset", "target", "--licence", "benchmark",
+                "--tags", "benchmark", *writer_args
+            ])
+            duration = time.perf_counter() - start
+
+        target = server.find_dataset("target")
+        written = 0 if target is None else len(target.files)
+        if written != num_files:
+            raise Exception(f"Expected {num_files} files to be written, got {written}")
+
+        return duration, server
+    finally:
+        server.uninstall()
+
+
+def main(args: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--domains", nargs="+", choices=tuple(SEEDERS), default=["ic", "od", "sp", "sc"],
+                        help="the domains to benchmark (default ic od sp sc)")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 1000],
+                        help="the numbers of files in the benchmarked datasets (default 100 1000)")
+    parser.add_argument("--file-size", type=int, default=16,
+                        help="the approximate size of each file in KB (default 16)")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="the latency added to each request in milliseconds (default 0)")
+    parser.add_argument("--bandwidth", type=float, default=None,
+                        help="the transfer rate of file contents in MB/sec (default unlimited)")
+    parser.add_argument("--reader-args", type=shlex.split, default=[],
+                        help="extra options for the from-ufdl-* reader, as a single string")
+    parser.add_argument("--writer-args", type=shlex.split, default=[],
+                        help="extra options for the to-ufdl-* writer, as a single string")
+    parsed = parser.parse_args(args)
+
+    bandwidth = None if parsed.bandwidth is None else parsed.bandwidth * 1024 * 1024
+
+    print(f"{'domain':<10}{'files':>8}{'seconds':>10}{'files/sec':>12}{'MB/sec':>10}{'requests':>10}")
+    for domain in parsed.domains:
+        for num_files in parsed.sizes:
+            duration, server = run_benchmark(
+                domain,
+                num_files,
+                parsed.file_size * 1024,
+                parsed.latency / 1000,
+                bandwidth,
+                parsed.reader_args,
+                parsed.writer_args
+            )
+
+            megabytes = (server.bytes_downloaded + server.bytes_uploaded) / (1024 * 1024)
+            print(
+                f"{domain:<10}{num_files:>8}{duration:>10.2f}{num_files / duration:>12.1f}"
+                f"{megabytes / duration:>10.2f}{sum(server.request_counts.values()):>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
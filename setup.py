@@ -39,7 +39,9 @@ setup(
         "ufdl.pythonclient==0.0.1",
         "ufdl.json-messages==0.0.1",
         "wai.annotations.core>=0.2.2,<0.3",
-        "moviepy==1.0.3"
+        "moviepy==1.0.3",
+        "numpy",
+        "Pillow"
     ],
     entry_points={
         "wai.annotations.plugins": [
@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, Optional
 
 from ufdl.json.speech import TranscriptionsFile
 
@@ -10,6 +10,7 @@ from wai.annotations.domain.audio import Audio
 from wai.annotations.domain.audio.speech import SpeechInstance, Transcription
 
 from ....common.component import UFDLReader
+from ....common.util import LazyAudio
 
 
 class UFDLSpeechReader(UFDLReader[SpeechInstance]):
@@ -23,7 +24,7 @@ class UFDLSpeechReader(UFDLReader[SpeechInstance]):
             self,
             pk: int,
             filename: str,
-            file_data: bytes,
+            file_data: Optional[bytes],
             then: ThenFunction[SpeechInstance]
     ):
         # Get the cache
@@ -31,7 +32,10 @@ class UFDLSpeechReader(UFDLReader[SpeechInstance]):
 
         # Download the transcriptions for this data-set if we haven't already
         if pk not in transcription_cache:
-            transcription_cache[pk] = TranscriptionsFile.from_raw_json(dataset.get_transcriptions(self.ufdl_context, pk))
+            with self.perf.timed("get_transcriptions"):
+                transcription_cache[pk] = TranscriptionsFile.from_raw_json(
+                    dataset.get_transcriptions(self.ufdl_context, pk)
+                )
 
         # Get the transcription file for this dataset from the cache
         transcription_file = transcription_cache[pk]
@@ -41,9 +45,15 @@ class UFDLSpeechReader(UFDLReader[SpeechInstance]):
         if filename in transcription_file:
             transcription = transcription_file[filename].transcription
 
+        # In annotations-only mode, only download the audio if its data is accessed
+        if file_data is None:
+            audio = LazyAudio(self.get_data_fetcher(pk, filename), filename, None)
+        else:
+            audio = Audio.from_file_data(filename, file_data)
+
         then(
             SpeechInstance(
-                Audio.from_file_data(filename, file_data),
+                audio,
                 Transcription(transcription) if transcription is not None else None
             )
         )
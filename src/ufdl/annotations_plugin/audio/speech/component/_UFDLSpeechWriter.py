@@ -1,8 +1,7 @@
-from typing import Optional, Set, Dict
+from typing import Optional
 
 from ufdl.pythonclient.functional.speech import dataset
 
-from wai.annotations.core.stream.util import ProcessState
 from wai.annotations.domain.audio.speech import SpeechInstance
 
 from ....common.component import UFDLWriter
@@ -13,31 +12,32 @@ class UFDLSpeechWriter(UFDLWriter[SpeechInstance]):
     """
     Writes instances to a speech data-set on a UFDL server.
     """
-    existing_files_cache: Dict[int, Set[str]] = ProcessState(lambda self: {})
-
     def get_dataset_methods(self) -> DatasetMethods:
         return dataset.list, dataset.create, dataset.copy
 
-    def write_to_dataset(self, element: SpeechInstance, dataset_pk: int, subfolder: Optional[str]):
-        # Get the existing files cache
-        existing_files_cache = self.existing_files_cache
+    def get_annotations_fingerprint(self, element: SpeechInstance) -> str:
+        return element.annotations.text if element.annotations is not None else ""
 
-        if dataset_pk not in existing_files_cache:
-            existing_files_cache[dataset_pk] = set(dataset.retrieve(self.ufdl_context, dataset_pk)['files'])
+    def write_to_dataset(self, element: SpeechInstance, dataset_pk: int, subfolder: Optional[str]):
+        # Get the files already in the dataset
+        existing_files = self.get_existing_files(dataset_pk)
 
         # Format the file-name with the folder
-        filename = element.data.filename if subfolder is None else f"{subfolder}/{element.data.filename}"
+        filename = self.format_filename(element, subfolder)
 
         # If this file already exists, delete it
-        if filename in existing_files_cache[dataset_pk]:
-            dataset.delete_file(self.ufdl_context, dataset_pk, filename)
+        if filename in existing_files:
+            with self.perf.timed("delete_file"):
+                dataset.delete_file(self.ufdl_context, dataset_pk, filename)
 
         # Upload the file data
-        dataset.add_file(self.ufdl_context, dataset_pk, filename, element.data.data)
+        with self.perf.timed("add_file", len(element.data.data)):
+            dataset.add_file(self.ufdl_context, dataset_pk, filename, element.data.data)
 
         # Add the filename to the cache
-        existing_files_cache[dataset_pk].add(filename)
+        existing_files.add(filename)
 
         # Upload the annotations
         if element.annotations is not None:
-            dataset.set_transcription_for_file(self.ufdl_context, dataset_pk, filename, element.annotations.text)
+            with self.perf.timed("set_transcription_for_file"):
+                dataset.set_transcription_for_file(self.ufdl_context, dataset_pk, filename, element.annotations.text)
@@ -1,15 +1,23 @@
+import os
+import tempfile
+import zlib
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from fnmatch import fnmatchcase
 from io import BytesIO
-from typing import List, TypeVar
+from itertools import zip_longest
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple, TypeVar
 
 from ufdl.pythonclient.functional.core import dataset
 
 from wai.annotations.core.component import SourceComponent
 from wai.annotations.core.stream import ThenFunction, DoneFunction
+from wai.annotations.core.stream.util import ProcessState
 
-from wai.common.cli.options import TypedOption
+from wai.common.cli.options import FlagOption, TypedOption
 
-from ..util import get_existing_dataset
+from ..util import ordered_map, FileCache, FileData, ReadCheckpoint, SpooledFile
 from .util import UFDLProjectSpecificMixin
 
 ExternalFormat = TypeVar("ExternalFormat")
@@ -28,48 +36,242 @@ class UFDLReader(UFDLProjectSpecificMixin, SourceComponent[ExternalFormat]):
         metavar="name:NAME[==VERSION] | pk:PK"
     )
 
+    download_workers: int = TypedOption(
+        "--download-workers",
+        type=int,
+        default=1,
+        help="the number of files to download from the server concurrently (default 1)",
+        metavar="N"
+    )
+
+    cache_dir: Optional[str] = TypedOption(
+        "--cache-dir",
+        type=str,
+        help="the directory to cache downloaded files in between runs (default is no caching)",
+        metavar="DIR"
+    )
+
+    cache_size: int = TypedOption(
+        "--cache-size",
+        type=int,
+        default=10240,
+        help="the maximum size of the download cache in MB, least-recently used files are evicted first "
+             "(default 10240)",
+        metavar="MB"
+    )
+
+    checkpoint_file: Optional[str] = TypedOption(
+        "--checkpoint",
+        type=str,
+        help="a journal file recording which files have been read, so that an interrupted "
+             "read can be resumed by re-running with the same journal",
+        metavar="FILE"
+    )
+
+    interleave: str = TypedOption(
+        "--interleave",
+        type=str,
+        choices=("sequential", "round-robin"),
+        default="sequential",
+        help="the order to read the files of multiple datasets in: each dataset in turn, or "
+             "alternating between datasets (default sequential)",
+        metavar="ORDER"
+    )
+
+    shard: Optional[str] = TypedOption(
+        "--shard",
+        type=str,
+        help="only read the I-th of N disjoint shards of each dataset's files, partitioned by a hash of "
+             "the filename (I counts from 0)",
+        metavar="I/N"
+    )
+
+    files_globs: List[str] = TypedOption(
+        "--files-glob",
+        type=str,
+        nargs="+",
+        help="only read files whose filenames match at least one of these glob patterns",
+        metavar="PATTERN"
+    )
+
+    files_list_file: Optional[str] = TypedOption(
+        "--files-list",
+        type=str,
+        help="a file listing the filenames of the files to read, one per line",
+        metavar="FILE"
+    )
+
+    annotations_only: bool = FlagOption(
+        "--annotations-only",
+        help="whether to defer downloading each file until its data is accessed, for pipelines "
+             "which only use the annotations (ignored by readers whose file data is parsed when "
+             "read, e.g. spectra)"
+    )
+
+    # The maximum number of datasets to resolve concurrently
+    RESOLVE_WORKERS: int = 8
+
+    # Whether instances can be created without their file data, for --annotations-only. Readers
+    # whose instances parse their data on creation override this, to keep downloading concurrently
+    SUPPORTS_LAZY_DATA: bool = True
+
+    # The on-disk cache of downloaded files, if enabled
+    file_cache: Optional[FileCache] = ProcessState(
+        lambda self: FileCache(self.cache_dir, self.cache_size * 1024 * 1024) if self.cache_dir is not None else None
+    )
+
+    # The version of each dataset being read, for validating cached files
+    dataset_versions: Dict[int, int] = ProcessState(lambda self: {})
+
+    # The shard index and count, if sharding
+    shard_spec: Optional[Tuple[int, int]] = ProcessState(lambda self: self._parse_shard())
+
+    # The filenames of the files to read, if restricted by --files-list
+    files_list: Optional[Set[str]] = ProcessState(lambda self: self._read_files_list())
+
+    # The journal of files already read, if resuming is enabled
+    checkpoint: Optional[ReadCheckpoint] = ProcessState(
+        lambda self: ReadCheckpoint(self.checkpoint_file) if self.checkpoint_file is not None else None
+    )
+
     def produce(
             self,
             then: ThenFunction[ExternalFormat],
             done: DoneFunction
     ):
-        for ds in self.datasets:
-            # Parse the name/version from the string
-            pk: int
-            if ds.startswith("name:"):
-                ds = ds[5:]
-                if "==" in ds:
-                    name, version = ds.split("==", 1)
-                    version = int(version)
-                else:
-                    name, version = ds, None
-                # Get the dataset's pk
-                pk = get_existing_dataset(dataset.list, self.ufdl_context, self.project_pk, name, version)
-
-                if pk is None:
-                    raise Exception(f"Couldn't find dataset {ds} in team '{self.team}', project '{self.project}'")
-            elif ds.startswith("pk:"):
-                pk = int(ds[3:])
-            else:
-                raise Exception(f"--datasets option values should be prefixed with either 'name:' or 'pk:', got {ds}")
+        # Open the cache and checkpoint before any download workers can access them
+        self.file_cache
+        self.perf
+        checkpoint = self.checkpoint
+
+        try:
+            self.read_datasets(then)
+        finally:
+            # Save the progress made, even if the read failed
+            if checkpoint is not None:
+                checkpoint.save()
+
+            self.report_performance()
+
+        done()
+
+    def read_datasets(self, then: ThenFunction[ExternalFormat]):
+        """
+        Reads the files of all the specified datasets.
+
+        :param then:    The function to forward the elements.
+        """
+        # Create the shared state before the datasets are resolved concurrently
+        self.ufdl_context
+        self.dataset_versions
+        if any(ds.startswith("name:") for ds in self.datasets):
+            self.project_pk
+
+        # Resolve all the datasets and get their file lists up front, concurrently
+        with ThreadPoolExecutor(min(len(self.datasets), UFDLReader.RESOLVE_WORKERS)) as executor:
+            dataset_files = list(executor.map(self.resolve_dataset, self.datasets))
+
+        # Select the files to read, and skip those read by a previous run
+        dataset_files = [
+            (pk, self.skip_checkpointed_files(pk, self.select_files(files)))
+            for pk, files in dataset_files
+        ]
 
-            # Get the list of files in the dataset
-            files = dataset.retrieve(self.ufdl_context, pk)["files"]
+        files = self.order_files(dataset_files)
 
-            for file in files:
-                # Download the file data
-                file_data = self.download_file_data(pk, file)
+        # If only the annotations are required, don't download the files up front
+        file_datas = (
+            ((pk, file, None) for pk, file in files) if self.annotations_only and self.SUPPORTS_LAZY_DATA
+            else self.download_files(files)
+        )
 
+        # Time the downstream stages separately from reading
+        if self.perf.enabled:
+            then = self.time_downstream(then)
+
+        for pk, file, file_data in file_datas:
+            try:
                 self.read_annotations(pk, file, file_data, then)
+            finally:
+                # Remove the file from disk if it was spooled
+                if isinstance(file_data, SpooledFile):
+                    file_data.close()
 
-        done()
+            if self.checkpoint is not None:
+                self.checkpoint.complete_file(self.get_checkpoint_key(pk), self.dataset_versions[pk], file)
+
+    def resolve_dataset(self, ds: str) -> Tuple[int, List[str]]:
+        """
+        Resolves a dataset specified on the command-line, and gets its list of files.
+        Called from a worker thread.
+
+        :param ds:  The dataset specification, as given to --datasets.
+        :return:    The primary key of the dataset, and the filenames of its files.
+        """
+        # Parse the name/version from the string
+        pk: int
+        if ds.startswith("name:"):
+            ds = ds[5:]
+            if "==" in ds:
+                name, version = ds.split("==", 1)
+                version = int(version)
+            else:
+                name, version = ds, None
+            # Get the dataset's pk
+            pk = self.find_dataset(dataset.list, name, version)
+
+            if pk is None:
+                raise Exception(f"Couldn't find dataset {ds} in team '{self.team}', project '{self.project}'")
+        elif ds.startswith("pk:"):
+            pk = int(ds[3:])
+        else:
+            raise Exception(f"--datasets option values should be prefixed with either 'name:' or 'pk:', got {ds}")
+
+        # Get the list of files in the dataset
+        with self.perf.timed("retrieve"):
+            dataset_json = dataset.retrieve(self.ufdl_context, pk)
+        self.dataset_versions[pk] = dataset_json["version"]
+
+        return pk, dataset_json["files"]
+
+    def time_downstream(self, then: ThenFunction[ExternalFormat]) -> ThenFunction[ExternalFormat]:
+        """
+        Wraps the function which forwards elements, so that the time spent in
+        the downstream stages is recorded.
+
+        :param then:    The function to forward the elements.
+        :return:        The timed function.
+        """
+        def timed_then(element: ExternalFormat):
+            with self.perf.timed("downstream"):
+                then(element)
+
+        return timed_then
+
+    def order_files(self, dataset_files: List[Tuple[int, List[str]]]) -> List[Tuple[int, str]]:
+        """
+        Orders the files of all datasets for reading, according to the --interleave option.
+        Files from the same dataset are always read in their original order.
+
+        :param dataset_files:   The primary key and filenames of each dataset.
+        :return:                The primary key and filename of each file, in reading order.
+        """
+        if self.interleave == "round-robin":
+            return [
+                pk_and_file
+                for pks_and_files in zip_longest(*([(pk, file) for file in files] for pk, files in dataset_files))
+                for pk_and_file in pks_and_files
+                if pk_and_file is not None
+            ]
+
+        return [(pk, file) for pk, files in dataset_files for file in files]
 
     @abstractmethod
     def read_annotations(
             self,
             pk: int,
             filename: str,
-            file_data: bytes,
+            file_data: Optional[FileData],
             then: ThenFunction[ExternalFormat]
     ):
         """
@@ -78,12 +280,101 @@ class UFDLReader(UFDLProjectSpecificMixin, SourceComponent[ExternalFormat]):
 
         :param pk:          The primary key of the dataset being accessed.
         :param filename:    The filename of the file being converted.
-        :param file_data:   The binary file data of the file being converted.
+        :param file_data:   The binary file data of the file being converted, or the
+                            spooled file if should_spool_file returned True for it.
+                            None in annotations-only mode (if SUPPORTS_LAZY_DATA), where
+                            the data should be fetched lazily using get_data_fetcher.
         :param then:        The function to forward the element.
         :return:            An iterator of annotated instances.
         """
         pass
 
+    def download_files(self, files: List[Tuple[int, str]]) -> Iterator[Tuple[int, str, FileData]]:
+        """
+        Downloads the file-data for each of the given files, using the configured
+        number of download workers. Files are always returned in the given order.
+
+        :param files:       The primary key of the dataset and the filename of each file.
+        :return:            An iterator of dataset-pk/filename/file-data triples.
+        """
+        # Get the number of files to fetch ahead of the one being read
+        window = self.get_download_window()
+
+        # If not fetching ahead, just download each file in turn
+        if window <= 1:
+            for pk, filename in files:
+                yield pk, filename, self.fetch_file(pk, filename)
+            return
+
+        with ThreadPoolExecutor(max(self.download_workers, 1)) as executor:
+            # Keep a bounded number of downloads in flight so memory use stays capped
+            file_datas = ordered_map(
+                lambda pk_and_filename: self.fetch_file(*pk_and_filename),
+                files,
+                executor,
+                window
+            )
+
+            for (pk, filename), file_data in zip(files, file_datas):
+                yield pk, filename, file_data
+
+    def get_data_fetcher(self, pk: int, filename: str) -> Callable[[], bytes]:
+        """
+        Gets a function which downloads the data for a file when called, for
+        creating instances whose data is fetched lazily.
+
+        :param pk:          The primary key of the dataset containing the file.
+        :param filename:    The filename of the file in the dataset.
+        :return:            The fetching function.
+        """
+        return partial(self.download_file_data, pk, filename)
+
+    def get_file_spooler(self, pk: int, filename: str) -> Callable[[], SpooledFile]:
+        """
+        Gets a function which downloads a file straight to disk when called, for
+        creating instances whose data is fetched lazily by tools which read from disk.
+
+        :param pk:          The primary key of the dataset containing the file.
+        :param filename:    The filename of the file in the dataset.
+        :return:            The spooling function.
+        """
+        return partial(self.spool_file_data, pk, filename)
+
+    def get_download_window(self) -> int:
+        """
+        Gets the maximum number of files to have downloading, or downloaded but not
+        yet read, at once. If 1, files are downloaded in the reading thread.
+
+        :return:    The size of the download window.
+        """
+        return 1 if self.download_workers <= 1 else 2 * self.download_workers
+
+    def fetch_file(self, pk: int, filename: str) -> FileData:
+        """
+        Retrieves everything required from the server to read a particular file.
+        May be called from a download worker thread.
+
+        :param pk:          The primary key of the dataset containing the file.
+        :param filename:    The filename of the file in the dataset.
+        :return:            The binary contents of the file, or the file they were spooled to.
+        """
+        if self.should_spool_file(pk, filename):
+            return self.spool_file_data(pk, filename)
+
+        return self.download_file_data(pk, filename)
+
+    def should_spool_file(self, pk: int, filename: str) -> bool:
+        """
+        Whether to download a file straight to disk instead of into memory. Sub-classes
+        which can read files from disk (e.g. large videos) can override this. May be
+        called from a download worker thread. Defaults to never spooling.
+
+        :param pk:          The primary key of the dataset containing the file.
+        :param filename:    The filename of the file in the dataset.
+        :return:            Whether to spool the file to disk.
+        """
+        return False
+
     def download_file_data(self, pk: int, filename: str) -> bytes:
         """
         Downloads the file-data for a particular file.
@@ -92,13 +383,187 @@ class UFDLReader(UFDLProjectSpecificMixin, SourceComponent[ExternalFormat]):
         :param filename:    The filename of the file in the dataset.
         :return:            The binary contents of the file.
         """
+        file_cache = self.file_cache
+
+        # Read the file from the cache if it is there
+        if file_cache is not None:
+            cached_path = file_cache.get(self.get_cache_key(pk, filename))
+            if cached_path is not None:
+                try:
+                    with self.perf.timed("cache_read") as timing, open(cached_path, "rb") as file:
+                        file_data = file.read()
+                        timing.num_bytes = len(file_data)
+                        return file_data
+                except FileNotFoundError:
+                    pass  # Evicted since it was found, so download it again
+
         # Create a binary buffer for accumulating the contents
         buffer = BytesIO()
 
         # Stream the contents from the server into the buffer
-        for chunk in dataset.get_file(self.ufdl_context, pk, filename):
-            buffer.write(chunk)
+        with self.perf.timed("get_file") as timing:
+            for chunk in dataset.get_file(self.ufdl_context, pk, filename):
+                buffer.write(chunk)
+            timing.num_bytes = buffer.tell()
+
+        # Get the contents of the buffer. getvalue hands over the buffer's
+        # storage without copying it, so the file is only held in memory once
+        file_data = buffer.getvalue()
+
+        if file_cache is not None:
+            file_cache.put(self.get_cache_key(pk, filename), (file_data,))
+
+        return file_data
+
+    def spool_file_data(self, pk: int, filename: str) -> SpooledFile:
+        """
+        Downloads the file-data for a particular file straight to a temporary
+        file on disk, without holding the contents in memory.
+
+        :param pk:          The primary key of the dataset containing the file.
+        :param filename:    The filename of the file in the dataset.
+        :return:            The spooled file.
+        """
+        file_cache = self.file_cache
+
+        # Files in the cache are already on disk, so use the cached copy directly,
+        # pinning it so it isn't evicted while in use
+        if file_cache is not None:
+            cache_key = self.get_cache_key(pk, filename)
+            cached_path = file_cache.get(cache_key, pin=True)
+            if cached_path is None:
+                with self.perf.timed("get_file") as timing:
+                    cached_path = file_cache.put(cache_key, dataset.get_file(self.ufdl_context, pk, filename), pin=True)
+                    timing.num_bytes = os.path.getsize(cached_path)
+            return SpooledFile(cached_path, delete=False, on_close=partial(file_cache.unpin, cache_key))
+
+        # Create the temporary file, keeping the extension for tools which rely on it
+        file_descriptor, path = tempfile.mkstemp(suffix=os.path.splitext(filename)[1])
+        spooled_file = SpooledFile(path)
+
+        # Stream the contents from the server to disk
+        with self.perf.timed("get_file") as timing, open(file_descriptor, "wb") as file:
+            for chunk in dataset.get_file(self.ufdl_context, pk, filename):
+                file.write(chunk)
+            timing.num_bytes = file.tell()
+
+        return spooled_file
+
+    def select_files(self, files: List[str]) -> List[str]:
+        """
+        Selects the files to read from a dataset, according to the --shard,
+        --files-glob and --files-list options.
+
+        :param files:   The filenames of the files in the dataset.
+        :return:        The filenames of the selected files, in their original order.
+        """
+        shard_spec = self.shard_spec
+        if shard_spec is not None:
+            index, count = shard_spec
+            files = [file for file in files if zlib.crc32(file.encode("utf-8")) % count == index]
 
-        # Return the contents of the buffer
-        buffer.seek(0)
-        return buffer.read()
+        if len(self.files_globs) > 0:
+            files = [file for file in files if any(fnmatchcase(file, glob) for glob in self.files_globs)]
+
+        files_list = self.files_list
+        if files_list is not None:
+            files = [file for file in files if file in files_list]
+
+        return files
+
+    def _parse_shard(self) -> Optional[Tuple[int, int]]:
+        """
+        Parses the --shard option.
+
+        :return:    The index of the shard to read, and the number of shards, or None if not sharding.
+        """
+        if self.shard is None:
+            return None
+
+        try:
+            index, count = map(int, self.shard.split("/"))
+        except ValueError:
+            raise Exception(f"--shard should be of the form I/N, got {self.shard}")
+
+        if not 0 <= index < count:
+            raise Exception(f"--shard index should be between 0 and {count - 1}, got {index}")
+
+        return index, count
+
+    def _read_files_list(self) -> Optional[Set[str]]:
+        """
+        Reads the file given to the --files-list option.
+
+        :return:    The filenames listed in the file, or None if not restricted to a list.
+        """
+        if self.files_list_file is None:
+            return None
+
+        with open(self.files_list_file, "r") as file:
+            return set(line.strip() for line in file if line.strip() != "")
+
+    def skip_checkpointed_files(self, pk: int, files: List[str]) -> List[str]:
+        """
+        Removes the files which were fully read by a previous run from the
+        list of files to read.
+
+        :param pk:      The primary key of the dataset containing the files.
+        :param files:   The filenames of the files in the dataset, in reading order.
+        :return:        The filenames of the files still to read.
+        """
+        if self.checkpoint is None:
+            return files
+
+        last_file = self.checkpoint.get_last_file(self.get_checkpoint_key(pk), self.dataset_versions[pk])
+
+        if last_file is None or last_file not in files:
+            return files
+
+        return files[files.index(last_file) + 1:]
+
+    def get_resume_frame_time(self, pk: int, filename: str) -> Optional[float]:
+        """
+        Gets the time of the last frame of a video which was read by a previous
+        run, so that reading can resume after it. May be called from a download
+        worker thread.
+
+        :param pk:          The primary key of the dataset containing the video.
+        :param filename:    The filename of the video in the dataset.
+        :return:            The frame-time, or None if no frames have been read.
+        """
+        if self.checkpoint is None:
+            return None
+
+        return self.checkpoint.get_last_frame_time(self.get_checkpoint_key(pk), self.dataset_versions[pk], filename)
+
+    def checkpoint_frame(self, pk: int, filename: str, frame_time: float):
+        """
+        Records that a frame of a video has been read, for readers which
+        read videos frame-by-frame.
+
+        :param pk:          The primary key of the dataset containing the video.
+        :param filename:    The filename of the video in the dataset.
+        :param frame_time:  The time of the frame that was read.
+        """
+        if self.checkpoint is not None:
+            self.checkpoint.complete_frame(self.get_checkpoint_key(pk), self.dataset_versions[pk], filename, frame_time)
+
+    def get_checkpoint_key(self, pk: int) -> str:
+        """
+        Gets the key identifying a dataset in the checkpoint journal.
+
+        :param pk:  The primary key of the dataset.
+        :return:    The key.
+        """
+        return f"{self.host}|{pk}"
+
+    def get_cache_key(self, pk: int, filename: str) -> str:
+        """
+        Gets the key for a file in the download cache. Cached files are only
+        valid for the version of the dataset they were downloaded from.
+
+        :param pk:          The primary key of the dataset containing the file.
+        :param filename:    The filename of the file in the dataset.
+        :return:            The cache key.
+        """
+        return f"{self.host}|{pk}|{self.dataset_versions.get(pk)}|{filename}"
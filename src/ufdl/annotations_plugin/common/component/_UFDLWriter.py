@@ -1,25 +1,28 @@
+import hashlib
+import threading
 from abc import ABC, abstractmethod
-from typing import TypeVar, Optional, List
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, TypeVar, Optional, List, Set, Tuple, Union
 
 from ufdl.json.core.filter import FilterSpec
 from ufdl.json.core.filter.field import Exact
 
-from ufdl.pythonclient.functional.core import licence
+from ufdl.pythonclient.functional.core import dataset, licence
 
-from wai.annotations.core.component.util import SplitSink, SplitState, RequiresNoSplitFinalisation
+from wai.annotations.core.component.util import SplitSink, SplitState
 from wai.annotations.core.stream.util import ProcessState
 from wai.annotations.core.util import InstanceState
 
 from wai.common.cli.options import TypedOption, FlagOption
 
-from ..util import get_existing_dataset
+from ..util import UploadManifest, UploadRecord
 from .util import UFDLProjectSpecificMixin, DatasetMethods
 
 ExternalFormat = TypeVar("ExternalFormat")
 
 
 class UFDLWriter(
-    RequiresNoSplitFinalisation,
     UFDLProjectSpecificMixin,
     SplitSink[ExternalFormat],
     ABC
@@ -78,11 +81,43 @@ class UFDLWriter(
         metavar="ACTION"
     )
 
+    resume: bool = FlagOption(
+        "--resume",
+        help="whether to resume an interrupted write, reusing the existing dataset(s) and only uploading "
+             "files not recorded in the sync manifest (requires --sync-manifest)"
+    )
+
     new_dataset_per_split: bool = FlagOption(
         "--new-dataset-per-split",
         help="whether to create a unique dataset per split (default is a separate sub-folder per split)"
     )
 
+    annotation_batch_size: int = TypedOption(
+        "--annotation-batch-size",
+        type=int,
+        default=100,
+        help="the number of files to upload annotations for in each request, where supported (default 100)",
+        metavar="SIZE"
+    )
+
+    upload_workers: int = TypedOption(
+        "--upload-workers",
+        type=int,
+        default=1,
+        help="the number of files to upload to the server concurrently (default 1)",
+        metavar="N"
+    )
+
+    sync_manifest_file: Optional[str] = TypedOption(
+        "--sync-manifest",
+        type=str,
+        help="a local file recording the hashes of uploaded files and annotations, so that "
+             "files which are unchanged since their last upload can be skipped. Uploads are recorded "
+             "against the name of the target dataset, so files are skipped when writing to the same "
+             "dataset again, or to a new version of it (as created by --on-existing copy)",
+        metavar="FILE"
+    )
+
     # The data-set the new data-sets will be based on
     source_dataset = ProcessState(lambda self: self._init_source_dataset())
 
@@ -100,8 +135,320 @@ class UFDLWriter(
     # The primary key of the specified licence
     licence_pk: int = ProcessState(lambda self: self._get_licence())
 
+    # The annotations waiting to be uploaded in a batch, per dataset
+    pending_annotations: Dict[int, List[Tuple[str, Any]]] = ProcessState(lambda self: {})
+
+    # The number of annotation batches uploaded so far
+    annotation_batch_count: int = ProcessState(lambda self: 0)
+
+    # Guards the pending annotations, as they are queued by the upload workers
+    pending_annotations_lock: threading.Lock = ProcessState(lambda self: threading.Lock())
+
+    # The files already in each dataset written to
+    existing_files_cache: Dict[int, Set[str]] = ProcessState(lambda self: {})
+
+    # Guards the existing files cache, as it is accessed by the upload workers
+    existing_files_lock: threading.Lock = ProcessState(lambda self: threading.Lock())
+
+    # The executors and files opened during the run, which are released when it finishes
+    opened_state: List[Union[Executor, UploadManifest]] = ProcessState(lambda self: [])
+
+    # The executor performing uploads concurrently, if enabled
+    upload_executor: Optional[ThreadPoolExecutor] = ProcessState(
+        lambda self: self.opened(ThreadPoolExecutor(self.upload_workers)) if self.upload_workers > 1 else None
+    )
+
+    # The uploads in progress, in submission order, keyed by dataset and filename
+    pending_uploads: Deque[Tuple[Tuple[int, str], Future]] = ProcessState(lambda self: deque())
+
+    # The record of previous uploads, if skipping unchanged files
+    sync_manifest: Optional[UploadManifest] = ProcessState(
+        lambda self: self.opened(UploadManifest(self.sync_manifest_file)) if self.sync_manifest_file is not None else None
+    )
+
+    # The key identifying each target dataset in the sync manifest, by primary key
+    sync_keys: Dict[int, str] = ProcessState(lambda self: {})
+
+    # The uploads not yet recorded in the sync manifest, keyed by dataset and filename, along
+    # with whether the file's annotations are waiting to be uploaded in a batch
+    unrecorded_uploads: Dict[Tuple[int, str], Tuple[UploadRecord, bool]] = ProcessState(lambda self: {})
+
+    # The number of new, updated and skipped files
+    sync_counts: Dict[str, int] = ProcessState(lambda self: {"new": 0, "updated": 0, "skipped": 0})
+
+    # Guards the unrecorded uploads and sync counts, as they are accessed by the upload workers
+    sync_lock: threading.Lock = ProcessState(lambda self: threading.Lock())
+
     def consume_element_for_split(self, element: ExternalFormat):
-        self.write_to_dataset(element, self.target_dataset, self.target_subfolder)
+        # Get the target for this split in the consuming thread, as it depends on the current split
+        dataset_pk = self.target_dataset
+        subfolder = self.target_subfolder
+
+        upload_executor = self.upload_executor
+
+        # If not uploading concurrently, just write the element
+        if upload_executor is None:
+            self.sync_to_dataset(element, dataset_pk, subfolder)
+            return
+
+        # Create the shared state before any upload workers can access it
+        self.perf
+        self.pending_annotations_lock
+        self.existing_files_cache
+        self.existing_files_lock
+        self.sync_manifest
+        self.sync_lock
+
+        pending_uploads = self.pending_uploads
+
+        # Wait for the oldest uploads to complete if too many are in flight
+        while len(pending_uploads) >= 2 * self.upload_workers:
+            pending_uploads.popleft()[1].result()
+
+        # Wait for any upload of the same file to complete, so a later delete/add
+        # of the file can't race with an earlier one
+        upload_key = (dataset_pk, self.format_filename(element, subfolder))
+        for key, upload in pending_uploads:
+            if key == upload_key:
+                upload.result()
+
+        pending_uploads.append((upload_key, upload_executor.submit(self.sync_to_dataset, element, dataset_pk, subfolder)))
+
+    def finish_split(self):
+        # Wait for all uploads to complete
+        self.wait_for_uploads()
+
+        # Upload any annotations still waiting for a full batch
+        self.flush_annotations()
+
+    def finish(self):
+        try:
+            super().finish()
+        finally:
+            # Only release the state which was actually created, shutting down the executors
+            # first so that no uploads are recorded after the manifest is closed
+            opened_state = self.opened_state
+            for state in opened_state:
+                if isinstance(state, Executor):
+                    state.shutdown()
+            for state in opened_state:
+                if isinstance(state, UploadManifest):
+                    state.close()
+
+            self.report_performance()
+
+        sync_counts = self.sync_counts
+        self.logger.info(
+            f"Uploaded {sync_counts['new']} new files, updated {sync_counts['updated']} files "
+            f"and skipped {sync_counts['skipped']} unchanged files"
+        )
+
+    def opened(self, state: Union[Executor, UploadManifest]) -> Union[Executor, UploadManifest]:
+        """
+        Registers an executor or manifest created during the run, so that it is
+        shut down or closed when the writer finishes.
+
+        :param state:   The executor or manifest.
+        :return:        The same executor or manifest.
+        """
+        self.opened_state.append(state)
+
+        return state
+
+    def wait_for_uploads(self):
+        """
+        Waits for all uploads in progress to complete, raising the error
+        of any which failed.
+        """
+        pending_uploads = self.pending_uploads
+
+        while len(pending_uploads) > 0:
+            pending_uploads.popleft()[1].result()
+
+    def sync_to_dataset(self, element: ExternalFormat, dataset_pk: int, subfolder: Optional[str]):
+        """
+        Writes an element to the given dataset, unless the sync manifest shows
+        that the server already has an identical copy of the file and its annotations.
+
+        :param element:         The instance to write.
+        :param dataset_pk:      The primary key of the target dataset.
+        :param subfolder:       The (optional) sub-folder to write into.
+        """
+        filename = self.format_filename(element, subfolder)
+        sync_manifest = self.sync_manifest
+
+        if sync_manifest is not None:
+            # Skip the file if it is unchanged since it was last uploaded. When resuming,
+            # the manifest is trusted without checking the server still has the file
+            record = (
+                hashlib.sha256(element.data.data).hexdigest(),
+                hashlib.sha256(self.get_annotations_fingerprint(element).encode("utf-8")).hexdigest()
+            )
+            if (
+                    sync_manifest.get(self.get_sync_key(dataset_pk), filename) == record
+                    and (self.resume or filename in self.get_existing_files(dataset_pk))
+            ):
+                self._count_upload("skipped")
+                return
+
+            with self.sync_lock:
+                self.unrecorded_uploads[(dataset_pk, filename)] = (record, False)
+
+        is_existing = filename in self.get_existing_files(dataset_pk)
+
+        self.write_to_dataset(element, dataset_pk, subfolder)
+
+        self._count_upload("updated" if is_existing else "new")
+
+        # Record the upload, unless we're still waiting to upload its annotations
+        if sync_manifest is not None:
+            with self.sync_lock:
+                record, is_queued = self.unrecorded_uploads.get((dataset_pk, filename), (None, True))
+            if not is_queued:
+                self._record_uploads(dataset_pk, [filename])
+
+    def get_sync_key(self, dataset_pk: int) -> str:
+        """
+        Gets the key identifying a target dataset in the sync manifest.
+
+        :param dataset_pk:  The primary key of the dataset.
+        :return:            The key.
+        """
+        return self.sync_keys[dataset_pk]
+
+    def _count_upload(self, kind: str):
+        """
+        Counts a file as new, updated or skipped.
+
+        :param kind:    The kind of upload.
+        """
+        with self.sync_lock:
+            self.sync_counts[kind] += 1
+
+    def _record_uploads(self, dataset_pk: int, filenames: List[str]):
+        """
+        Records completed uploads in the sync manifest.
+
+        :param dataset_pk:  The primary key of the dataset the files were uploaded to.
+        :param filenames:   The filenames of the uploaded files.
+        """
+        sync_manifest = self.sync_manifest
+        if sync_manifest is None:
+            return
+
+        sync_key = self.get_sync_key(dataset_pk)
+        for filename in filenames:
+            with self.sync_lock:
+                entry = self.unrecorded_uploads.pop((dataset_pk, filename), None)
+            if entry is not None:
+                sync_manifest.record(sync_key, filename, *entry[0])
+
+    @staticmethod
+    def format_filename(element: ExternalFormat, subfolder: Optional[str]) -> str:
+        """
+        Formats the filename that an element is written under.
+
+        :param element:     The instance being written.
+        :param subfolder:   The (optional) sub-folder being written into.
+        :return:            The filename in the dataset.
+        """
+        return element.data.filename if subfolder is None else f"{subfolder}/{element.data.filename}"
+
+    def get_existing_files(self, dataset_pk: int) -> Set[str]:
+        """
+        Gets the set of files in a dataset, retrieving them from the server the
+        first time the dataset is written to. Writers should add each file they
+        upload to the set.
+
+        :param dataset_pk:  The primary key of the dataset.
+        :return:            The filenames of the files in the dataset.
+        """
+        # Get the existing files cache
+        existing_files_cache = self.existing_files_cache
+
+        with self.existing_files_lock:
+            if dataset_pk not in existing_files_cache:
+                with self.perf.timed("retrieve"):
+                    existing_files_cache[dataset_pk] = set(dataset.retrieve(self.ufdl_context, dataset_pk)['files'])
+
+            return existing_files_cache[dataset_pk]
+
+    def queue_annotations(self, dataset_pk: int, filename: str, annotations: Any):
+        """
+        Queues the annotations for a file to be uploaded as part of a batch. The
+        batch is uploaded via upload_annotations once it is full, or at the end
+        of the split. May be called from an upload worker thread.
+
+        :param dataset_pk:      The primary key of the dataset containing the file.
+        :param filename:        The filename of the file in the dataset.
+        :param annotations:     The annotations for the file.
+        """
+        # The file can't be recorded as uploaded until its annotations are
+        with self.sync_lock:
+            unrecorded_upload = self.unrecorded_uploads.get((dataset_pk, filename))
+            if unrecorded_upload is not None:
+                self.unrecorded_uploads[(dataset_pk, filename)] = (unrecorded_upload[0], True)
+
+        with self.pending_annotations_lock:
+            pending_annotations = self.pending_annotations.setdefault(dataset_pk, [])
+
+            pending_annotations.append((filename, annotations))
+
+            # Take the batch to upload if it is full
+            batch = None
+            if len(pending_annotations) >= self.annotation_batch_size:
+                batch = self.pending_annotations.pop(dataset_pk)
+                self.annotation_batch_count += 1
+                batch_number = self.annotation_batch_count
+
+        # Upload outside the lock so other workers can keep queueing
+        if batch is not None:
+            self._upload_annotation_batch(dataset_pk, batch, batch_number)
+
+    def flush_annotations(self):
+        """
+        Uploads all queued annotations.
+        """
+        with self.pending_annotations_lock:
+            batches = []
+            for dataset_pk, batch in self.pending_annotations.items():
+                self.annotation_batch_count += 1
+                batches.append((dataset_pk, batch, self.annotation_batch_count))
+            self.pending_annotations.clear()
+
+        for dataset_pk, batch, batch_number in batches:
+            self._upload_annotation_batch(dataset_pk, batch, batch_number)
+
+    def _upload_annotation_batch(self, dataset_pk: int, batch: List[Tuple[str, Any]], batch_number: int):
+        """
+        Uploads a batch of annotations, reporting which files were affected on failure.
+
+        :param dataset_pk:      The primary key of the dataset containing the files.
+        :param batch:           The filenames and annotations of the files in the batch.
+        :param batch_number:    The number of the batch, for error reporting.
+        """
+        filenames = [filename for filename, _ in batch]
+
+        try:
+            with self.perf.timed("upload_annotations"):
+                self.upload_annotations(dataset_pk, batch)
+        except Exception as e:
+            raise Exception(
+                f"Failed to upload annotation batch {batch_number} to dataset {dataset_pk} "
+                f"for files: {', '.join(filenames)}"
+            ) from e
+
+        self._record_uploads(dataset_pk, filenames)
+
+    def upload_annotations(self, dataset_pk: int, batch: List[Tuple[str, Any]]):
+        """
+        Uploads a batch of queued annotations. Must be overridden by writers
+        which use queue_annotations.
+
+        :param dataset_pk:      The primary key of the dataset containing the files.
+        :param batch:           The filenames and annotations of the files in the batch.
+        """
+        raise NotImplementedError(self.upload_annotations.__qualname__)
 
     @abstractmethod
     def write_to_dataset(self, element: ExternalFormat, dataset_pk: int, subfolder: Optional[str]):
@@ -114,6 +461,17 @@ class UFDLWriter(
         """
         pass
 
+    @abstractmethod
+    def get_annotations_fingerprint(self, element: ExternalFormat) -> str:
+        """
+        Gets a string which uniquely represents the annotations of an
+        instance, for detecting when they have changed.
+
+        :param element:     The instance.
+        :return:            The fingerprint of the instance's annotations.
+        """
+        pass
+
     @abstractmethod
     def get_dataset_methods(self) -> DatasetMethods:
         """
@@ -130,14 +488,12 @@ class UFDLWriter(
 
         :return:    The primary key of the source data-set.
         """
+        # Resuming relies on the manifest to know which files were written
+        if self.resume and self.sync_manifest_file is None:
+            raise Exception("--resume requires a --sync-manifest to resume from")
+
         # See if the data-set already exists
-        dataset_pk = get_existing_dataset(
-            self.dataset_methods[0],
-            self.ufdl_context,
-            self.project_pk,
-            self.dataset,
-            self.version
-        )
+        dataset_pk = self.find_dataset(self.dataset_methods[0], self.dataset, self.version)
 
         # Dataset already exists
         if dataset_pk is not None:
@@ -146,13 +502,13 @@ class UFDLWriter(
                 version_string = "" if self.version is None else f" (v{self.version})"
                 raise Exception(f"Dataset named '{self.dataset}'{version_string} already exists (pk = {dataset_pk})")
 
-            # If we are overwriting or creating split data-sets, the source is the existing dataset
-            elif self.on_existing == "overwrite" or (self.is_splitting and self.new_dataset_per_split):
+            # If we are overwriting, resuming or creating split data-sets, the source is the existing dataset
+            elif self.on_existing == "overwrite" or self.resume or (self.is_splitting and self.new_dataset_per_split):
                 return dataset_pk
 
             # Otherwise copy the existing data-set
             else:
-                return self.dataset_methods[2](self.ufdl_context, dataset_pk)['pk']
+                return self._copy_dataset(dataset_pk)
 
         # Dataset doesn't already exist
         else:
@@ -171,13 +527,56 @@ class UFDLWriter(
         :return:    The target data-set's primary key.
         """
         if self.is_splitting and self.new_dataset_per_split:
-            split_name = f"{self.dataset}-{self.split_label}"
-            if self.source_dataset is None:
-                return self._create_new_dataset(split_name)
-            else:
-                return self.dataset_methods[2](self.ufdl_context, self.source_dataset, split_name)['pk']
+            name = f"{self.dataset}-{self.split_label}"
+            dataset_pk = self._init_split_dataset(name)
+        else:
+            name = self.dataset
+            dataset_pk = self.source_dataset
+
+        # Key the manifest on the dataset's name rather than its primary key, so that
+        # uploads are still recognised in new versions of the dataset
+        self.sync_keys[dataset_pk] = f"{self.host}|{self.get_dataset_name_prefix(self.dataset_methods[0], name)}"
+
+        return dataset_pk
+
+    def _init_split_dataset(self, name: str) -> int:
+        """
+        Initialises the dataset for a split, when creating a dataset per split.
+
+        :param name:    The name of the split's dataset.
+        :return:        The dataset's primary key.
+        """
+        # If resuming, continue writing to the split's dataset from the interrupted write
+        if self.resume:
+            dataset_pk = self.find_dataset(self.dataset_methods[0], name)
+            if dataset_pk is not None:
+                return dataset_pk
+
+        if self.source_dataset is None:
+            return self._create_new_dataset(name)
+        else:
+            return self._copy_dataset(self.source_dataset, name)
+
+    def _copy_dataset(self, dataset_pk: int, name: Optional[str] = None) -> int:
+        """
+        Copies a dataset.
+
+        :param dataset_pk:  The primary key of the dataset to copy.
+        :param name:        The name to give the copy, or None to make the
+                            copy a new version of the specified dataset.
+        :return:            The primary key of the copy.
+        """
+        if name is None:
+            copy_pk = self.dataset_methods[2](self.ufdl_context, dataset_pk)['pk']
         else:
-            return self.source_dataset
+            copy_pk = self.dataset_methods[2](self.ufdl_context, dataset_pk, name)['pk']
+
+        # The latest version of the copy's name has changed
+        self.invalidate_names(
+            self.get_dataset_name_prefix(self.dataset_methods[0], self.dataset if name is None else name)
+        )
+
+        return copy_pk
 
     def _create_new_dataset(self, name: str) -> int:
         """
@@ -188,9 +587,12 @@ class UFDLWriter(
         :return:            The primary key of the new dataset.
         """
         # See if there is an existing dataset
-        if get_existing_dataset(self.dataset_methods[0], self.ufdl_context, self.project_pk, name) is not None:
+        if self.find_dataset(self.dataset_methods[0], name) is not None:
             raise Exception(f"A dataset named '{name}' already exists")
 
+        # Any cached resolution of the name is no longer valid
+        self.invalidate_names(self.get_dataset_name_prefix(self.dataset_methods[0], name))
+
         return self.dataset_methods[1](
             self.ufdl_context,
             name,
@@ -212,14 +614,24 @@ class UFDLWriter(
             raise Exception("No licence specified")
 
         # Get the licence with the given name
+        licence_pk = self.resolve_name(f"licence|{self.licence}", self._find_licence)
+
+        # If no licence with that name was found, error
+        if licence_pk is None:
+            raise Exception(f"No licence named '{self.licence}'")
+
+        return licence_pk
+
+    def _find_licence(self) -> Optional[int]:
+        """
+        Looks up the primary key of the specified licence on the server.
+
+        :return:    The licence's primary key, or None if it doesn't exist.
+        """
         licences = licence.list(self.ufdl_context, FilterSpec(
             expressions=[
                 Exact(field="name", value=self.licence)
             ]
         ))
 
-        # If no licence with that name was found, error
-        if len(licences) == 0:
-            raise Exception(f"No licence named '{self.licence}'")
-
-        return licences[0]['pk']
+        return None if len(licences) == 0 else licences[0]['pk']
@@ -1,11 +1,14 @@
 from abc import ABC
+from typing import Callable, Optional
 
 from ufdl.pythonclient import UFDLServerContext
 
 from wai.annotations.core.util import InstanceState
 
 from wai.common.cli import OptionValueHandler
-from wai.common.cli.options import TypedOption
+from wai.common.cli.options import FlagOption, TypedOption
+
+from ...util import get_server_context, NameCache, PerfRecorder
 
 
 class UFDLContextOptionsMixin(OptionValueHandler, ABC):
@@ -38,5 +41,96 @@ class UFDLContextOptionsMixin(OptionValueHandler, ABC):
         metavar="PASSWORD"
     )
 
-    # The connection to the UFDL server
-    ufdl_context = InstanceState(lambda self: UFDLServerContext(self.host, self.username, self.password))
+    name_cache_file: Optional[str] = TypedOption(
+        "--name-cache",
+        type=str,
+        help="a file to cache the primary keys of named teams, projects, licences and datasets in "
+             "between runs (default is no caching)",
+        metavar="FILE"
+    )
+
+    name_cache_ttl: float = TypedOption(
+        "--name-cache-ttl",
+        type=float,
+        default=300.0,
+        help="the number of seconds cached names remain valid for (default 300)",
+        metavar="SECONDS"
+    )
+
+    perf_report: bool = FlagOption(
+        "--perf-report",
+        help="whether to log a table of the time spent in each kind of operation when finished"
+    )
+
+    perf_report_file: Optional[str] = TypedOption(
+        "--perf-report-file",
+        type=str,
+        help="a file to write the time spent in each kind of operation to when finished, "
+             "in Prometheus text format if the extension is '.prom', or JSON otherwise. The "
+             "reader and writer of a conversion can share the same file",
+        metavar="FILE"
+    )
+
+    # Records the time spent in each kind of operation, if reporting is enabled
+    perf: PerfRecorder = InstanceState(
+        lambda self: PerfRecorder(self.perf_report or self.perf_report_file is not None)
+    )
+
+    # The cache of resolved names, if enabled
+    name_cache: Optional[NameCache] = InstanceState(
+        lambda self: NameCache.open(self.name_cache_file) if self.name_cache_file is not None else None
+    )
+
+    # The connection to the UFDL server, shared with other components using the same server and user
+    ufdl_context: UFDLServerContext = InstanceState(
+        lambda self: get_server_context(self.host, self.username, self.password)
+    )
+
+    def resolve_name(self, key: str, resolver: Callable[[], Optional[int]]) -> Optional[int]:
+        """
+        Resolves a name on the server to a primary key, using the name cache
+        if enabled. Names which don't resolve are never cached.
+
+        :param key:         The key identifying the name, unique across the kinds of object named.
+        :param resolver:    Resolves the name using the server, returning None if it doesn't exist.
+        :return:            The primary key the name resolves to, or None if it doesn't exist.
+        """
+        name_cache = self.name_cache
+
+        if name_cache is None:
+            return resolver()
+
+        # Try the cache first
+        key = f"{self.host}|{key}"
+        pk = name_cache.get(key, self.name_cache_ttl)
+
+        # Otherwise ask the server, and cache the answer
+        if pk is None:
+            pk = resolver()
+            if pk is not None:
+                name_cache.put(key, pk)
+
+        return pk
+
+    def invalidate_names(self, prefix: str):
+        """
+        Removes any names which may have changed from the name cache.
+
+        :param prefix:  The prefix of the keys of the names to remove.
+        """
+        if self.name_cache is not None:
+            self.name_cache.invalidate(f"{self.host}|{prefix}")
+
+    def report_performance(self):
+        """
+        Reports the time spent in each kind of operation, as configured
+        by the --perf-report and --perf-report-file options.
+        """
+        if not self.perf.enabled:
+            return
+
+        if self.perf_report:
+            self.logger.info(f"Performance report for {type(self).__name__}:\n{self.perf.summary()}")
+
+        if self.perf_report_file is not None:
+            self.perf.write(self.perf_report_file, type(self).__name__)
@@ -1,4 +1,5 @@
 from abc import ABC
+from typing import Optional
 
 from ufdl.json.core.filter import FilterSpec
 from ufdl.json.core.filter.field import Exact
@@ -10,6 +11,7 @@ from wai.annotations.core.util import InstanceState
 from wai.common.cli.options import TypedOption
 
 
+from ...util import get_existing_dataset, DATASET_LIST_METHOD_TYPE
 from ._UFDLContextOptionsMixin import UFDLContextOptionsMixin
 
 
@@ -43,25 +45,74 @@ class UFDLProjectSpecificMixin(UFDLContextOptionsMixin, ABC):
 
         :return:    The project's primary key.
         """
-        # Get the list of teams with the given name (should be at most one)
-        teams = team.list(self.ufdl_context, self._get_team_filter())
+        # Get the primary key of the team with the given name
+        team_pk = self.resolve_name(f"team|{self.team}", self._find_team)
 
         # If none, then the team doesn't exist
-        if len(teams) == 0:
+        if team_pk is None:
             raise Exception(f"No team named '{self.team}'")
 
-        # Get the primary key of the team
-        team_pk = teams[0]['pk']
+        # Get the primary key of the project owned by that team, with the given name
+        project_pk = self.resolve_name(f"project|{team_pk}|{self.project}", lambda: self._find_project(team_pk))
+
+        # If none, then the project doesn't exist
+        if project_pk is None:
+            raise Exception(f"No project named '{self.project}'")
+
+        return project_pk
+
+    def _find_team(self) -> Optional[int]:
+        """
+        Looks up the primary key of the specified team on the server.
+
+        :return:    The team's primary key, or None if it doesn't exist.
+        """
+        # Get the list of teams with the given name (should be at most one)
+        teams = team.list(self.ufdl_context, self._get_team_filter())
+
+        return None if len(teams) == 0 else teams[0]['pk']
 
+    def _find_project(self, team_pk: int) -> Optional[int]:
+        """
+        Looks up the primary key of the specified project on the server.
+
+        :param team_pk:     The primary key of the team which owns the project.
+        :return:            The project's primary key, or None if it doesn't exist.
+        """
         # Get the list of projects owned by that team, with the given name (should be at most one)
         projects = project.list(self.ufdl_context, self._get_project_filter(team_pk))
 
-        # If none, then the project doesn't exist
-        if len(projects) == 0:
-            raise Exception(f"No project named '{self.project}'")
+        return None if len(projects) == 0 else projects[0]['pk']
+
+    def find_dataset(
+            self,
+            list_function: DATASET_LIST_METHOD_TYPE,
+            name: str,
+            version: Optional[int] = None
+    ) -> Optional[int]:
+        """
+        Gets the primary key of the specified dataset in the project, if it
+        exists, using the name cache if enabled.
 
-        # Get the primary key of the project
-        return projects[0]['pk']
+        :param list_function:   The function to use to list the datasets on the UFDL server.
+        :param name:            The name of the dataset to look for.
+        :param version:         The version to look for, or None to select the latest version.
+        :return:                Dataset primary key or None.
+        """
+        return self.resolve_name(
+            f"{self.get_dataset_name_prefix(list_function, name)}{version}",
+            lambda: get_existing_dataset(list_function, self.ufdl_context, self.project_pk, name, version)
+        )
+
+    def get_dataset_name_prefix(self, list_function: DATASET_LIST_METHOD_TYPE, name: str) -> str:
+        """
+        Gets the prefix of the name-cache keys for all versions of a dataset.
+
+        :param list_function:   The function used to list the datasets on the UFDL server.
+        :param name:            The name of the dataset.
+        :return:                The key prefix.
+        """
+        return f"dataset|{list_function.__module__}|{self.project_pk}|{name}|"
 
     def _get_team_filter(self) -> FilterSpec:
         """
@@ -0,0 +1,166 @@
+import hashlib
+import os
+import tempfile
+import threading
+from typing import Dict, Iterable, Iterator, Optional
+
+
+class FileCache:
+    """
+    A persistent on-disk cache of file contents, keyed by arbitrary strings. The
+    total size of the cache is capped, with the least-recently used files being
+    evicted first. Files can be pinned while they are in use, so they aren't
+    evicted from under their users. Safe to use from multiple threads.
+    """
+    # The fraction of the maximum size to evict down to when the cache is full,
+    # so that eviction isn't required on every subsequent write
+    EVICTION_TARGET: float = 0.9
+
+    def __init__(self, directory: str, max_size: int):
+        """
+        :param directory:   The directory to store the cached files in.
+        :param max_size:    The maximum total size of the cached files, in bytes.
+        """
+        os.makedirs(directory, exist_ok=True)
+
+        self._directory: str = directory
+        self._max_size: int = max_size
+        self._lock = threading.Lock()
+
+        # Get the size of the files already in the cache
+        self._size: int = sum(os.path.getsize(path) for path in self._iterate_cached_files())
+
+        # The number of users of each pinned file, by path
+        self._pins: Dict[str, int] = {}
+
+    def get(self, key: str, pin: bool = False) -> Optional[str]:
+        """
+        Gets the path to the cached file for the given key.
+
+        :param key:     The key of the file.
+        :param pin:     Whether to pin the file, so it isn't evicted until unpinned.
+        :return:        The path to the cached file, or None if the key isn't cached.
+        """
+        path = self._path_for(key)
+
+        with self._lock:
+            # Mark the file as recently used (the modification time is used as the LRU order)
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                return None
+
+            if pin:
+                self._pin(path)
+
+        return path
+
+    def put(self, key: str, chunks: Iterable[bytes], pin: bool = False) -> str:
+        """
+        Adds a file to the cache. The file just added is never evicted to make room
+        for itself, so the cache can briefly exceed its maximum size if the file is larger
+        than the cache, until another file is added.
+
+        :param key:     The key of the file.
+        :param chunks:  The contents of the file.
+        :param pin:     Whether to pin the file, so it isn't evicted until unpinned.
+        :return:        The path to the cached file.
+        """
+        path = self._path_for(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        # Write to a temporary file first so partially-written files are never visible
+        file_descriptor, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            size = 0
+            with open(file_descriptor, "wb") as file:
+                for chunk in chunks:
+                    file.write(chunk)
+                    size += len(chunk)
+
+            with self._lock:
+                # Account for any copy of the file we are replacing
+                if os.path.exists(path):
+                    self._size -= os.path.getsize(path)
+
+                os.replace(tmp_path, path)
+                self._size += size
+
+                if pin:
+                    self._pin(path)
+
+                if self._size > self._max_size:
+                    self._evict(path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return path
+
+    def unpin(self, key: str):
+        """
+        Releases a pin on a file, taken by get or put. The file can be evicted
+        once all its pins are released.
+
+        :param key:     The key of the file.
+        """
+        path = self._path_for(key)
+
+        with self._lock:
+            count = self._pins.get(path, 0) - 1
+            if count > 0:
+                self._pins[path] = count
+            else:
+                self._pins.pop(path, None)
+
+    def _pin(self, path: str):
+        """
+        Pins a file. Must be called with the lock held.
+
+        :param path:    The path to the cached file.
+        """
+        self._pins[path] = self._pins.get(path, 0) + 1
+
+    def _evict(self, added_path: str):
+        """
+        Removes the least-recently used files until the cache is below its
+        eviction target size, skipping pinned files and the file just added.
+        Must be called with the lock held.
+
+        :param added_path:  The path to the file just added to the cache.
+        """
+        # Sort the cached files from least to most recently used
+        files = sorted(
+            ((os.stat(path), path) for path in self._iterate_cached_files()),
+            key=lambda stat_and_path: stat_and_path[0].st_mtime
+        )
+
+        target_size = int(self._max_size * FileCache.EVICTION_TARGET)
+        for stat, path in files:
+            if self._size <= target_size:
+                break
+            if path == added_path or path in self._pins:
+                continue
+            os.remove(path)
+            self._size -= stat.st_size
+
+    def _path_for(self, key: str) -> str:
+        """
+        Gets the path in the cache directory for a key.
+
+        :param key:     The key.
+        :return:        The path.
+        """
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self._directory, digest[:2], digest)
+
+    def _iterate_cached_files(self) -> Iterator[str]:
+        """
+        Iterates over the paths of the files in the cache, ignoring partially-written files.
+        """
+        for directory, _, filenames in os.walk(self._directory):
+            for filename in filenames:
+                if not filename.endswith(".tmp"):
+                    yield os.path.join(directory, filename)
@@ -0,0 +1,10 @@
+from wai.annotations.domain.audio import Audio
+
+from ._LazyDataMixin import LazyDataMixin
+
+
+class LazyAudio(LazyDataMixin, Audio):
+    """
+    An audio file whose binary contents are downloaded when first accessed.
+    """
+    pass
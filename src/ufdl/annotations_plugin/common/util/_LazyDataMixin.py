@@ -0,0 +1,32 @@
+from typing import Callable, Optional
+
+
+class LazyDataMixin:
+    """
+    Mixin for domain data types (images, audio, etc.) whose binary contents
+    aren't downloaded until they are first accessed, so that pipelines which
+    only use the annotations never download the files at all. The data is
+    fetched in the process which first accesses it.
+    """
+    def __init__(self, fetch_data: Callable[[], bytes], *args, **kwargs):
+        """
+        :param fetch_data:  Fetches the binary contents of the file when first required.
+        :param args:        The positional arguments to the data type's constructor.
+        :param kwargs:      The keyword arguments to the data type's constructor.
+        """
+        self._fetch_data: Optional[Callable[[], bytes]] = fetch_data
+        self._lazy_data: Optional[bytes] = None
+        super().__init__(*args, **kwargs)
+
+    @property
+    def data(self) -> bytes:
+        # Fetch the data the first time it is accessed
+        if self._lazy_data is None and self._fetch_data is not None:
+            self._lazy_data = self._fetch_data()
+            self._fetch_data = None
+
+        return self._lazy_data
+
+    @data.setter
+    def data(self, value: Optional[bytes]):
+        self._lazy_data = value
@@ -0,0 +1,34 @@
+from typing import Callable, Optional, Tuple
+
+from wai.annotations.domain.image import Image, ImageFormat
+
+from ._LazyDataMixin import LazyDataMixin
+
+
+class LazyImage(LazyDataMixin, Image):
+    """
+    An image whose binary contents are downloaded when first accessed. If the
+    size of the image isn't given, it is only determined (from the downloaded
+    contents) when it is first accessed as well.
+    """
+    def __init__(
+            self,
+            fetch_data: Callable[[], bytes],
+            filename: str,
+            data: Optional[bytes] = None,
+            format: Optional[ImageFormat] = None,
+            size: Optional[Tuple[int, int]] = None
+    ):
+        # Image determines a missing size from the data on construction, so
+        # give it a placeholder and determine the real size when it is accessed
+        super().__init__(fetch_data, filename, data, format, size if size is not None else (-1, -1))
+        self._is_size_known: bool = size is not None
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        if not self._is_size_known:
+            pil_image = self.pil_image
+            self._size = (pil_image.width, pil_image.height) if pil_image is not None else None
+            self._is_size_known = True
+
+        return super().size
@@ -0,0 +1,113 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class NameCache:
+    """
+    A persistent cache of the primary keys that names (of teams, projects, etc.)
+    resolve to on UFDL servers, so that short-lived conversions needn't query the
+    server for them each time. Entries expire after a time-to-live. Caches are
+    shared by all components in the process via NameCache.open, and are safe to
+    use from multiple threads.
+    """
+    # The caches open in this process, keyed by path
+    _open_caches: Dict[str, 'NameCache'] = {}
+
+    # Guards the open caches
+    _open_caches_lock = threading.Lock()
+
+    def __init__(self, path: str):
+        """
+        :param path:    The path to the cache file. Created if it doesn't exist.
+        """
+        self._path: str = path
+        self._lock = threading.Lock()
+
+        # The cached primary key for each name, and the time it was resolved
+        self._entries: Dict[str, Tuple[int, float]] = {}
+        if os.path.exists(path):
+            with open(path, "r") as file:
+                self._entries = {key: (pk, resolved) for key, (pk, resolved) in json.load(file).items()}
+
+    @classmethod
+    def open(cls, path: str) -> 'NameCache':
+        """
+        Gets the cache stored at the given path, sharing it with any other
+        components which have it open.
+
+        :param path:    The path to the cache file.
+        :return:        The cache.
+        """
+        path = os.path.abspath(path)
+
+        with cls._open_caches_lock:
+            cache = cls._open_caches.get(path)
+
+            if cache is None:
+                cache = cls(path)
+                cls._open_caches[path] = cache
+
+            return cache
+
+    def get(self, key: str, ttl: float) -> Optional[int]:
+        """
+        Gets the primary key that a name resolved to.
+
+        :param key:     The key identifying the name.
+        :param ttl:     The maximum age of the entry, in seconds.
+        :return:        The primary key, or None if the name isn't cached or has expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is None or time.time() - entry[1] > ttl:
+            return None
+
+        return entry[0]
+
+    def put(self, key: str, pk: int):
+        """
+        Caches the primary key that a name resolved to.
+
+        :param key:     The key identifying the name.
+        :param pk:      The primary key.
+        """
+        with self._lock:
+            self._entries[key] = (pk, time.time())
+            self._save()
+
+    def invalidate(self, prefix: str):
+        """
+        Removes all entries whose keys start with the given prefix.
+
+        :param prefix:  The prefix of the keys to remove.
+        """
+        with self._lock:
+            keys: List[str] = [key for key in self._entries if key.startswith(prefix)]
+
+            if len(keys) == 0:
+                return
+
+            for key in keys:
+                del self._entries[key]
+
+            self._save()
+
+    def _save(self):
+        """
+        Writes the cache to disk. Must be called with the lock held.
+        """
+        # Write to a temporary file first, then replace the cache file in one step
+        file_descriptor, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self._path), suffix=".tmp")
+        try:
+            with open(file_descriptor, "w") as file:
+                json.dump(self._entries, file)
+            os.replace(tmp_path, self._path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
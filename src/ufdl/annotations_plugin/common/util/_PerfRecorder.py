@@ -0,0 +1,202 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, List
+
+
+class OperationTiming:
+    """
+    Times a single operation, as a context manager. The number of bytes
+    transferred by the operation can be set while it is in progress.
+    """
+    def __init__(self, recorder: 'PerfRecorder', operation: str, num_bytes: int):
+        self._recorder: 'PerfRecorder' = recorder
+        self._operation: str = operation
+        self.num_bytes: int = num_bytes
+        self._start: float = 0.0
+
+    def __enter__(self) -> 'OperationTiming':
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._recorder.record(self._operation, time.perf_counter() - self._start, self.num_bytes)
+
+
+class _NullTiming:
+    """
+    Timing used when recording is disabled, which does nothing.
+    """
+    num_bytes: int = 0
+
+    def __enter__(self) -> '_NullTiming':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+# The single no-op timing, shared so that disabled recording allocates nothing
+_NULL_TIMING = _NullTiming()
+
+
+class PerfRecorder:
+    """
+    Records the number of calls, latency and bytes transferred of each kind of
+    operation a component performs (requests to the server, frame extraction, etc.),
+    and reports them as a summary table, JSON or a Prometheus text-file. Safe to
+    use from multiple threads. When disabled, timing an operation is a no-op.
+    """
+    # The recorders of the components which have written to each report file
+    # in this process, keyed by path and then by component
+    _written_recorders: Dict[str, Dict[str, 'PerfRecorder']] = {}
+
+    # Guards the written recorders, and the report files themselves
+    _written_recorders_lock = threading.Lock()
+
+    def __init__(self, enabled: bool):
+        """
+        :param enabled:     Whether to record operations.
+        """
+        self._enabled: bool = enabled
+        self._lock = threading.Lock()
+
+        # The call count, total seconds, maximum seconds and total bytes of each operation
+        self._stats: Dict[str, List[float]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def timed(self, operation: str, num_bytes: int = 0):
+        """
+        Times an operation, for use as a context manager.
+
+        :param operation:   The name of the operation.
+        :param num_bytes:   The number of bytes transferred by the operation, if known in advance.
+        :return:            The timing context manager.
+        """
+        if not self._enabled:
+            return _NULL_TIMING
+
+        return OperationTiming(self, operation, num_bytes)
+
+    def record(self, operation: str, seconds: float, num_bytes: int = 0):
+        """
+        Records a completed operation.
+
+        :param operation:   The name of the operation.
+        :param seconds:     The time the operation took.
+        :param num_bytes:   The number of bytes transferred by the operation.
+        """
+        if not self._enabled:
+            return
+
+        with self._lock:
+            stats = self._stats.get(operation)
+
+            if stats is None:
+                self._stats[operation] = [1, seconds, seconds, num_bytes]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                stats[2] = max(stats[2], seconds)
+                stats[3] += num_bytes
+
+    def to_json(self) -> Dict[str, Dict[str, float]]:
+        """
+        Gets the recorded statistics of each operation.
+
+        :return:    The statistics, keyed by operation.
+        """
+        with self._lock:
+            return {
+                operation: {
+                    "count": count,
+                    "total_seconds": total,
+                    "mean_seconds": total / count,
+                    "max_seconds": maximum,
+                    "bytes": num_bytes
+                }
+                for operation, (count, total, maximum, num_bytes) in sorted(self._stats.items())
+            }
+
+    def summary(self) -> str:
+        """
+        Formats the recorded statistics as a table.
+
+        :return:    The table.
+        """
+        lines = [f"{'operation':<28}{'count':>10}{'total s':>12}{'mean ms':>12}{'max ms':>12}{'MB':>12}"]
+
+        for operation, stats in self.to_json().items():
+            lines.append(
+                f"{operation:<28}{stats['count']:>10}{stats['total_seconds']:>12.3f}"
+                f"{stats['mean_seconds'] * 1000:>12.2f}{stats['max_seconds'] * 1000:>12.2f}"
+                f"{stats['bytes'] / (1024 * 1024):>12.2f}"
+            )
+
+        return "\n".join(lines)
+
+    @staticmethod
+    def to_prometheus(recorders: Dict[str, 'PerfRecorder']) -> str:
+        """
+        Formats the recorded statistics of some components in the Prometheus
+        text exposition format.
+
+        :param recorders:   The recorders of the components, keyed by the component
+                            name, which is added to each statistic as a label.
+        :return:            The formatted statistics.
+        """
+        metrics = (
+            ("operations_total", "count", "Number of operations performed"),
+            ("operation_seconds_total", "total_seconds", "Total time spent in operations"),
+            ("operation_seconds_max", "max_seconds", "Longest time spent in a single operation"),
+            ("operation_bytes_total", "bytes", "Total bytes transferred by operations"),
+        )
+
+        stats = {component: recorder.to_json() for component, recorder in recorders.items()}
+
+        lines = []
+        for name, key, description in metrics:
+            lines.append(f"# HELP ufdl_annotations_{name} {description}")
+            lines.append(f"# TYPE ufdl_annotations_{name} {'gauge' if key == 'max_seconds' else 'counter'}")
+            for component, component_stats in stats.items():
+                for operation, operation_stats in component_stats.items():
+                    lines.append(
+                        f'ufdl_annotations_{name}{{component="{component}",operation="{operation}"}} '
+                        f'{operation_stats[key]}'
+                    )
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str, component: str):
+        """
+        Writes the recorded statistics to a file, in Prometheus text format if the
+        file has a '.prom' extension, or JSON otherwise. The file also includes the
+        statistics of any other components in the process (e.g. the reader and the
+        writer of a conversion) which have written to it, so they don't overwrite
+        each other's reports.
+
+        :param path:        The file to write.
+        :param component:   The name of the component the statistics are for.
+        """
+        with PerfRecorder._written_recorders_lock:
+            recorders = PerfRecorder._written_recorders.setdefault(os.path.abspath(path), {})
+            recorders[component] = self
+
+            with open(path, "w") as file:
+                if path.endswith(".prom"):
+                    file.write(PerfRecorder.to_prometheus(recorders))
+                else:
+                    json.dump(
+                        {
+                            "components": {
+                                component: recorder.to_json()
+                                for component, recorder in recorders.items()
+                            }
+                        },
+                        file,
+                        indent=2
+                    )
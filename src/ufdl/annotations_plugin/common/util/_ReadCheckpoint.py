@@ -0,0 +1,123 @@
+import json
+import os
+import tempfile
+import time
+from typing import Optional
+
+
+class ReadCheckpoint:
+    """
+    A journal of how far a reader has got through each dataset, so that an
+    interrupted read can be resumed without re-reading completed files. Records
+    the last file fully emitted from each dataset, and the last frame emitted from
+    a partially-emitted video. The journal is saved atomically, at most once per
+    save interval, so that a crash never leaves it corrupted.
+    """
+    # The minimum number of seconds between saves of the journal
+    SAVE_INTERVAL: float = 1.0
+
+    def __init__(self, path: str):
+        """
+        :param path:    The path to the journal file. Created if it doesn't exist.
+        """
+        self._path: str = path
+        self._last_save: float = 0.0
+
+        # The progress through each dataset, keyed by dataset
+        self._datasets: dict = {}
+        if os.path.exists(path):
+            with open(path, "r") as file:
+                self._datasets = json.load(file)
+
+    def get_last_file(self, dataset_key: str, version: int) -> Optional[str]:
+        """
+        Gets the last file fully emitted from a dataset.
+
+        :param dataset_key:     The key identifying the dataset.
+        :param version:         The version of the dataset being read. Progress
+                                through other versions is ignored.
+        :return:                The filename of the last emitted file, or None
+                                if no files have been emitted.
+        """
+        progress = self._datasets.get(dataset_key)
+
+        if progress is None or progress["version"] != version:
+            return None
+
+        return progress.get("file")
+
+    def get_last_frame_time(self, dataset_key: str, version: int, filename: str) -> Optional[float]:
+        """
+        Gets the time of the last frame emitted from a partially-emitted video.
+
+        :param dataset_key:     The key identifying the dataset.
+        :param version:         The version of the dataset being read.
+        :param filename:        The filename of the video.
+        :return:                The frame-time, or None if no frames of the video
+                                have been emitted.
+        """
+        progress = self._datasets.get(dataset_key)
+
+        if progress is None or progress["version"] != version:
+            return None
+
+        partial = progress.get("partial")
+
+        if partial is None or partial["file"] != filename:
+            return None
+
+        return partial["frame_time"]
+
+    def complete_file(self, dataset_key: str, version: int, filename: str):
+        """
+        Records that a file has been fully emitted.
+
+        :param dataset_key:     The key identifying the dataset.
+        :param version:         The version of the dataset being read.
+        :param filename:        The filename of the emitted file.
+        """
+        self._datasets[dataset_key] = {"version": version, "file": filename}
+        self._save_if_due()
+
+    def complete_frame(self, dataset_key: str, version: int, filename: str, frame_time: float):
+        """
+        Records that a frame of a video has been emitted.
+
+        :param dataset_key:     The key identifying the dataset.
+        :param version:         The version of the dataset being read.
+        :param filename:        The filename of the video.
+        :param frame_time:      The time of the emitted frame.
+        """
+        progress = self._datasets.get(dataset_key)
+
+        if progress is None or progress["version"] != version:
+            progress = {"version": version}
+            self._datasets[dataset_key] = progress
+
+        progress["partial"] = {"file": filename, "frame_time": frame_time}
+        self._save_if_due()
+
+    def save(self):
+        """
+        Writes the journal to disk.
+        """
+        # Write to a temporary file first, then replace the journal in one step
+        directory = os.path.dirname(os.path.abspath(self._path))
+        file_descriptor, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with open(file_descriptor, "w") as file:
+                json.dump(self._datasets, file)
+            os.replace(tmp_path, self._path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self._last_save = time.monotonic()
+
+    def _save_if_due(self):
+        """
+        Saves the journal if it hasn't been saved within the save interval.
+        """
+        if time.monotonic() - self._last_save >= ReadCheckpoint.SAVE_INTERVAL:
+            self.save()
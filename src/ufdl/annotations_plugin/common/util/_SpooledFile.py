@@ -0,0 +1,100 @@
+import os
+import tempfile
+import weakref
+from typing import Callable, Optional
+
+
+class SpooledFile:
+    """
+    The contents of a file downloaded from a UFDL server, which have been spooled
+    straight to disk rather than held in memory. Unless told otherwise, the file on
+    disk is deleted when this object is closed or garbage-collected.
+    """
+    def __init__(self, path: str, delete: bool = True, on_close: Optional[Callable[[], None]] = None):
+        """
+        :param path:        The path to the spooled file.
+        :param delete:      Whether to delete the file when closed.
+        :param on_close:    An optional function to call when closed (e.g. to release
+                            the file when it belongs to a cache).
+        """
+        self._path: str = path
+
+        # Make sure the spooled file is cleaned up even if close is never called
+        self._finalizer = (
+            weakref.finalize(self, _close, path if delete else None, on_close)
+            if delete or on_close is not None
+            else None
+        )
+
+    @classmethod
+    def from_data(cls, data: bytes, suffix: str = "") -> 'SpooledFile':
+        """
+        Spools some in-memory file contents to a temporary file.
+
+        :param data:    The binary contents of the file.
+        :param suffix:  The suffix (e.g. extension) to give the temporary file.
+        :return:        The spooled file.
+        """
+        file_descriptor, path = tempfile.mkstemp(suffix=suffix)
+        spooled_file = cls(path)
+
+        with open(file_descriptor, "wb") as file:
+            file.write(data)
+
+        return spooled_file
+
+    @property
+    def path(self) -> str:
+        """
+        The path to the spooled file on disk.
+        """
+        return self._path
+
+    def read(self) -> bytes:
+        """
+        Reads the entire contents of the spooled file into memory.
+
+        :return:    The binary contents of the file.
+        """
+        with open(self._path, "rb") as file:
+            return file.read()
+
+    def close(self):
+        """
+        Deletes the spooled file from disk, if it is to be deleted, and
+        calls the on-close function, if any. Only has an effect the first time.
+        """
+        if self._finalizer is not None:
+            self._finalizer()
+
+    def __enter__(self) -> 'SpooledFile':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _close(path: Optional[str], on_close: Optional[Callable[[], None]]):
+    """
+    Cleans up a spooled file.
+
+    :param path:        The path to the file to remove, or None to keep it.
+    :param on_close:    The function to call on closing, if any.
+    """
+    if path is not None:
+        _remove_if_exists(path)
+
+    if on_close is not None:
+        on_close()
+
+
+def _remove_if_exists(path: str):
+    """
+    Removes a file from disk, if it still exists.
+
+    :param path:    The path to the file.
+    """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
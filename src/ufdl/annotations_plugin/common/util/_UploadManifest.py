@@ -0,0 +1,85 @@
+import json
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+# The content and annotations hashes of an uploaded file
+UploadRecord = Tuple[str, str]
+
+
+class UploadManifest:
+    """
+    A local record of the files uploaded to datasets on UFDL servers, along with
+    hashes of their contents and annotations at the time of upload. Entries are
+    appended to the manifest file as each upload completes, so the manifest
+    remains valid if the upload is interrupted. Safe to use from multiple threads.
+    """
+    def __init__(self, path: str):
+        """
+        :param path:    The path to the manifest file. Created if it doesn't exist.
+        """
+        self._path: str = path
+        self._lock = threading.Lock()
+
+        # The latest record for each file, keyed by dataset and filename
+        self._records: Dict[Tuple[str, str], UploadRecord] = {}
+
+        # Load any records from previous uploads
+        if os.path.exists(path):
+            with open(path, "r") as file:
+                for line in file:
+                    # Ignore a partially-written final line from an interrupted upload
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self._records[(entry["dataset"], entry["file"])] = (entry["content"], entry["annotations"])
+
+        self._file = open(path, "a")
+
+        # Terminate any partially-written final line so new entries start on their own line
+        if self._file.tell() > 0:
+            with open(path, "rb") as file:
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b"\n":
+                    self._file.write("\n")
+
+    def get(self, dataset_key: str, filename: str) -> Optional[UploadRecord]:
+        """
+        Gets the record of the last upload of a file.
+
+        :param dataset_key:     The key identifying the dataset the file was uploaded to.
+        :param filename:        The filename of the file in the dataset.
+        :return:                The content and annotations hashes of the file,
+                                or None if it hasn't been uploaded.
+        """
+        with self._lock:
+            return self._records.get((dataset_key, filename))
+
+    def record(self, dataset_key: str, filename: str, content_hash: str, annotations_hash: str):
+        """
+        Records the successful upload of a file.
+
+        :param dataset_key:         The key identifying the dataset the file was uploaded to.
+        :param filename:            The filename of the file in the dataset.
+        :param content_hash:        The hash of the file's contents.
+        :param annotations_hash:    The hash of the file's annotations.
+        """
+        entry = json.dumps({
+            "dataset": dataset_key,
+            "file": filename,
+            "content": content_hash,
+            "annotations": annotations_hash
+        })
+
+        with self._lock:
+            self._records[(dataset_key, filename)] = (content_hash, annotations_hash)
+            self._file.write(entry + "\n")
+            self._file.flush()
+
+    def close(self):
+        """
+        Closes the manifest file.
+        """
+        with self._lock:
+            self._file.close()
@@ -1,10 +1,22 @@
 """
 Utilities for common functionality between all data domains.
 """
+from ._FileCache import FileCache
 from ._get_existing_dataset import get_existing_dataset
+from ._get_server_context import get_server_context
+from ._LazyAudio import LazyAudio
+from ._LazyDataMixin import LazyDataMixin
+from ._LazyImage import LazyImage
+from ._NameCache import NameCache
+from ._ordered_map import ordered_map
+from ._PerfRecorder import OperationTiming, PerfRecorder
+from ._ReadCheckpoint import ReadCheckpoint
+from ._SpooledFile import SpooledFile
 from ._typing import (
     DATASET_LIST_METHOD_TYPE,
     DATASET_COPY_METHOD_TYPE,
     DATASET_CREATE_METHOD_TYPE,
-    DATASET_RETRIEVE_METHOD_TYPE
+    DATASET_RETRIEVE_METHOD_TYPE,
+    FileData
 )
+from ._UploadManifest import UploadManifest, UploadRecord
@@ -0,0 +1,34 @@
+import threading
+from typing import Dict, Tuple
+
+from ufdl.pythonclient import UFDLServerContext
+
+# The server contexts shared by all components in this process, keyed by host, username and password
+_SERVER_CONTEXTS: Dict[Tuple[str, str, str], UFDLServerContext] = {}
+
+# Guards the shared server contexts
+_SERVER_CONTEXTS_LOCK = threading.Lock()
+
+
+def get_server_context(host: str, username: str, password: str) -> UFDLServerContext:
+    """
+    Gets the context for accessing a UFDL server as a particular user. Contexts
+    are shared by all components in the process, so a pipeline which reads from
+    and writes to the same server only logs in once, and reuses the same
+    connections and tokens for both.
+
+    :param host:        The UFDL server.
+    :param username:    The username of the user on the server.
+    :param password:    The user's password.
+    :return:            The server context.
+    """
+    key = (host, username, password)
+
+    with _SERVER_CONTEXTS_LOCK:
+        context = _SERVER_CONTEXTS.get(key)
+
+        if context is None:
+            context = UFDLServerContext(host, username, password)
+            _SERVER_CONTEXTS[key] = context
+
+        return context
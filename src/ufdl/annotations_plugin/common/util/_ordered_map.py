@@ -0,0 +1,45 @@
+from collections import deque
+from concurrent.futures import Executor, Future
+from typing import Callable, Deque, Iterable, Iterator, TypeVar
+
+ItemType = TypeVar("ItemType")
+ResultType = TypeVar("ResultType")
+
+
+def ordered_map(
+        function: Callable[[ItemType], ResultType],
+        items: Iterable[ItemType],
+        executor: Executor,
+        window: int
+) -> Iterator[ResultType]:
+    """
+    Maps a function over some items concurrently using an executor, yielding
+    the results in the same order as the items. At most 'window' items are
+    submitted ahead of the result currently being yielded, so the number of
+    results held in memory is bounded.
+
+    :param function:    The function to apply to each item.
+    :param items:       The items to map over.
+    :param executor:    The executor to run the function calls on.
+    :param window:      The maximum number of calls in flight at once.
+    :return:            An iterator over the results, in item order.
+    """
+    # The calls which have been submitted but not yet yielded, in item order
+    pending: Deque[Future] = deque()
+
+    try:
+        for item in items:
+            # Wait for the oldest call to complete if the window is full
+            if len(pending) >= window:
+                yield pending.popleft().result()
+
+            pending.append(executor.submit(function, item))
+
+        # Yield the remaining results
+        while len(pending) > 0:
+            yield pending.popleft().result()
+
+    finally:
+        # Cancel any calls that haven't started if we are stopped early
+        for future in pending:
+            future.cancel()
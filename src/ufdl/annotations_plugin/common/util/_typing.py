@@ -1,4 +1,4 @@
-from typing import Callable, Optional
+from typing import Callable, Optional, Union
 
 from ufdl.json.core.filter import FilterSpec
 
@@ -7,8 +7,13 @@ from ufdl.pythonclient import UFDLServerContext
 from wai.json.object import OptionallyPresent
 from wai.json.raw import RawJSONArray, RawJSONObject
 
+from ._SpooledFile import SpooledFile
+
 # The types of the UFDL Python-client functions used by the components
 DATASET_LIST_METHOD_TYPE = Callable[[UFDLServerContext, Optional[FilterSpec]], RawJSONArray]
 DATASET_CREATE_METHOD_TYPE = Callable[[UFDLServerContext, str, int, int, str, bool, str], RawJSONObject]
 DATASET_COPY_METHOD_TYPE = Callable[[UFDLServerContext, int, OptionallyPresent[str]], RawJSONObject]
 DATASET_RETRIEVE_METHOD_TYPE = Callable[[UFDLServerContext, int], RawJSONObject]
+
+# The contents of a downloaded file, either in memory or spooled to disk
+FileData = Union[bytes, SpooledFile]
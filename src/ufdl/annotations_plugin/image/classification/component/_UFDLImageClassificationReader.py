@@ -1,4 +1,5 @@
-from typing import Dict
+import os
+from typing import Dict, Optional
 
 from ufdl.json.image_classification import CategoriesFile
 
@@ -7,10 +8,11 @@ from ufdl.pythonclient.functional.image_classification import dataset
 from wai.annotations.core.stream import ThenFunction
 from wai.annotations.core.stream.util import ProcessState
 from wai.annotations.domain.classification import Classification
-from wai.annotations.domain.image import Image
+from wai.annotations.domain.image import Image, ImageFormat
 from wai.annotations.domain.image.classification import ImageClassificationInstance
 
 from ....common.component import UFDLReader
+from ....common.util import LazyImage
 
 
 class UFDLImageClassificationReader(UFDLReader[ImageClassificationInstance]):
@@ -24,7 +26,7 @@ class UFDLImageClassificationReader(UFDLReader[ImageClassificationInstance]):
             self,
             pk: int,
             filename: str,
-            file_data: bytes,
+            file_data: Optional[bytes],
             then: ThenFunction[ImageClassificationInstance]
     ):
         # Get the cache
@@ -32,7 +34,8 @@ class UFDLImageClassificationReader(UFDLReader[ImageClassificationInstance]):
 
         # Download the categories for this data-set if we haven't already
         if pk not in category_cache:
-            category_cache[pk] = CategoriesFile.from_raw_json(dataset.get_categories(self.ufdl_context, pk))
+            with self.perf.timed("get_categories"):
+                category_cache[pk] = CategoriesFile.from_raw_json(dataset.get_categories(self.ufdl_context, pk))
 
         # Get the category file for this dataset from the cache
         category_file = category_cache[pk]
@@ -44,9 +47,21 @@ class UFDLImageClassificationReader(UFDLReader[ImageClassificationInstance]):
             if len(categories) > 0:
                 category = categories[0]
 
+        # In annotations-only mode, only download the image if its data is accessed
+        if file_data is None:
+            image = LazyImage(
+                self.get_data_fetcher(pk, filename),
+                filename,
+                None,
+                ImageFormat.for_extension(os.path.splitext(filename)[1][1:]),
+                None
+            )
+        else:
+            image = Image.from_file_data(filename, file_data)
+
         then(
             ImageClassificationInstance(
-                Image.from_file_data(filename, file_data),
+                image,
                 Classification(category) if category is not None else None
             )
         )
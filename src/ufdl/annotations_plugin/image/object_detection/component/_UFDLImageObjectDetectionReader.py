@@ -1,12 +1,15 @@
-import os
 import re
-import tempfile
+import threading
+import time
 from abc import ABC, abstractmethod
+from collections import deque
 from fnmatch import fnmatchcase
 from fractions import Fraction
-from typing import Dict, Iterator, List, Optional, Tuple
+from functools import partial
+from typing import Callable, Collection, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
 
-from moviepy.video.io.VideoFileClip import VideoFileClip
 from ufdl.json.object_detection import (
     Annotation,
     ImageAnnotation,
@@ -16,7 +19,8 @@ from ufdl.json.object_detection import (
 
 from ufdl.pythonclient.functional.object_detection import dataset
 
-from wai.annotations.core.stream import ThenFunction
+from wai.annotations.core.stream import ThenFunction, DoneFunction
+from wai.annotations.core.stream.util import ProcessState
 from wai.annotations.domain.image import Image, ImageFormat
 from wai.annotations.domain.image.object_detection import ImageObjectDetectionInstance
 from wai.annotations.domain.image.object_detection.util import set_object_label, set_object_prefix
@@ -29,6 +33,20 @@ from wai.json.object import Absent
 from wai.json.raw import RawJSONArray, RawJSONObject
 
 from ....common.component import UFDLReader
+from ....common.util import FileCache, FileData, LazyImage, SpooledFile
+from ..util import (
+    EncodedFrame,
+    format_frame_filename,
+    frame_indices,
+    FrameCache,
+    get_frame_rate,
+    iterate_video_frames,
+    LazyVideo,
+    plan_extraction_times,
+    snap_to_frames,
+    times_on_grid,
+    VideoDecodePool
+)
 
 
 class UnlabelledExtractionSpecHolder(CLIRepresentable):
@@ -93,7 +111,7 @@ class UnlabelledExtractionSpec(ABC):
             return SpecificUnlabelledExtractionSpec(glob, *map(Fraction, times))
 
     @abstractmethod
-    def get_times(self, length: float) -> Iterator[float]:
+    def get_times(self, length: float) -> np.ndarray:
         raise NotImplementedError(self.get_times.__qualname__)
 
 
@@ -110,27 +128,27 @@ class EveryUnlabelledExtractionSpec(UnlabelledExtractionSpec):
         self._step = step
         self._offset = offset
 
-    def get_times(self, length: float) -> Iterator[float]:
+    def get_times(self, length: float) -> np.ndarray:
         step = self._step
         start = self._offset
+        length = Fraction(length)
         if step < 0:
             if start > 0:
                 start %= step
             start += length
         else:
             if start < 0:
-                start %= 0
+                start %= step
 
-        class It(Iterator[float]):
-            def __next__(self) -> float:
-                nonlocal step, start, length
-                result = start
-                if result > length or result < 0:
-                    raise StopIteration
-                start += step
-                return float(result)
+        # The number of steps from the start that stay within [0, length]
+        if start < 0 or start > length:
+            count = 0
+        elif step < 0:
+            count = int(start // -step) + 1
+        else:
+            count = int((length - start) // step) + 1
 
-        return It()
+        return times_on_grid(start, step, count)
 
 
 class SpecificUnlabelledExtractionSpec(UnlabelledExtractionSpec):
@@ -142,11 +160,14 @@ class SpecificUnlabelledExtractionSpec(UnlabelledExtractionSpec):
         super().__init__(filename_glob_pattern)
         self._times = list(times)
 
-    def get_times(self, length: float) -> Iterator[float]:
-        yield from (
-            float(time)
-            for time in self._times
-            if 0 <= time <= length
+    def get_times(self, length: float) -> np.ndarray:
+        return np.array(
+            [
+                float(time)
+                for time in self._times
+                if 0 <= time <= length
+            ],
+            dtype=np.float64
         )
 
 
@@ -164,11 +185,171 @@ class UFDLImageObjectDetectionReader(UFDLReader[ImageObjectDetectionInstance]):
         metavar="[GLOB@](every:STEP[+/-OFFSET] | TIME[,TIME]*"
     )
 
+    max_frame_skip: int = TypedOption(
+        "--max-frame-skip",
+        type=int,
+        default=100,
+        help="the largest gap (in frames) between extracted video frames to decode through "
+             "rather than seek (default 100)",
+        metavar="FRAMES"
+    )
+
+    frame_format: ImageFormat = TypedOption(
+        "--frame-format",
+        type=ImageFormat,
+        choices=(ImageFormat.JPG, ImageFormat.PNG),
+        default=ImageFormat.JPG,
+        help="the image format to extract video frames as (default jpg)",
+        metavar="FORMAT"
+    )
+
+    frame_quality: int = TypedOption(
+        "--frame-quality",
+        type=int,
+        default=75,
+        help="the quality (1-95) to encode extracted video frames with, for JPEG frames (default 75)",
+        metavar="QUALITY"
+    )
+
+    video_decode_workers: int = TypedOption(
+        "--video-decode-workers",
+        type=int,
+        default=0,
+        help="the number of worker processes to decode videos in parallel (default 0, "
+             "decodes videos in the reading thread)",
+        metavar="N"
+    )
+
+    frame_cache_dir: Optional[str] = TypedOption(
+        "--frame-cache-dir",
+        type=str,
+        help="the directory to cache extracted video frames in between runs, so frames "
+             "extracted before needn't be decoded again (default is no caching)",
+        metavar="DIR"
+    )
+
+    frame_cache_size: int = TypedOption(
+        "--frame-cache-size",
+        type=int,
+        default=10240,
+        help="the maximum size of the frame cache in MB, least-recently used frames are evicted first "
+             "(default 10240)",
+        metavar="MB"
+    )
+
+    # Caches the annotations file for each dataset so it need only be retrieved once
+    annotations_cache: Dict[int, RawJSONObject] = ProcessState(lambda self: {})
+
+    # Guards the annotations cache, as it is accessed by the download workers
+    annotations_cache_lock: threading.Lock = ProcessState(lambda self: threading.Lock())
+
+    # The pool of processes which decode videos in parallel, if enabled
+    video_decode_pool: Optional[VideoDecodePool] = ProcessState(
+        lambda self: VideoDecodePool(self.video_decode_workers) if self.video_decode_workers > 0 else None
+    )
+
+    # The cache of extracted video frames, if enabled
+    frame_cache: Optional[FrameCache] = ProcessState(
+        lambda self: FrameCache(
+            FileCache(self.frame_cache_dir, self.frame_cache_size * 1024 * 1024),
+            self.frame_format,
+            self.frame_quality
+        ) if self.frame_cache_dir is not None else None
+    )
+
+    # The frames of the videos being decoded in the decode pool, by dataset and filename
+    decoding_videos: Dict[Tuple[int, str], Iterator[EncodedFrame]] = ProcessState(lambda self: {})
+
+    def produce(
+            self,
+            then: ThenFunction[ImageObjectDetectionInstance],
+            done: DoneFunction
+    ):
+        # Check the options before reading anything
+        if not 1 <= self.frame_quality <= 95:
+            raise Exception(f"--frame-quality should be between 1 and 95, got {self.frame_quality}")
+
+        # Create the shared state before any download workers can access it
+        video_decode_pool = self.video_decode_pool
+        self.annotations_cache_lock
+        self.frame_cache
+        self.decoding_videos
+
+        try:
+            super().produce(then, done)
+        finally:
+            # Abandon any videos decoded ahead of a file which was never reached
+            decoding_videos = self.decoding_videos
+            for decoding_frames in decoding_videos.values():
+                decoding_frames.close()
+            decoding_videos.clear()
+
+            if video_decode_pool is not None:
+                video_decode_pool.shutdown()
+
+    def get_download_window(self) -> int:
+        # Fetch far enough ahead to keep all video decode workers busy
+        return max(super().get_download_window(), 2 * self.video_decode_workers)
+
+    def download_files(self, files: List[Tuple[int, str]]) -> Iterator[Tuple[int, str, FileData]]:
+        downloads = super().download_files(files)
+
+        if self.video_decode_pool is None:
+            yield from downloads
+            return
+
+        # Start decoding videos in the decode pool a few files ahead of the one being read,
+        # so that several videos are decoded at once. Decodes are submitted from the reading
+        # thread in dataset order, so the pool (which runs them in submission order) always
+        # gets to the video being read before any of the videos after it
+        look_ahead: Deque[Tuple[int, str, FileData]] = deque()
+        for pk, filename, file_data in downloads:
+            self.start_decoding(pk, filename, file_data)
+            look_ahead.append((pk, filename, file_data))
+
+            if len(look_ahead) > self.video_decode_workers:
+                yield look_ahead.popleft()
+
+        while len(look_ahead) > 0:
+            yield look_ahead.popleft()
+
+    def start_decoding(self, pk: int, filename: str, file_data: FileData):
+        """
+        Starts extracting the frames of a downloaded video in the decode pool.
+        Does nothing if the file isn't a video, or has no frames to extract.
+
+        :param pk:          The primary key of the dataset containing the file.
+        :param filename:    The filename of the file in the dataset.
+        :param file_data:   The downloaded file.
+        """
+        file_type, annotations = self.get_file_metadata(pk, filename)
+        if file_type is None or file_type.get('length', None) is None:
+            return
+
+        json_video = self.parse_video(file_type, annotations)
+        extraction_times = self.get_extraction_times(pk, filename, json_video)
+        if len(extraction_times) == 0:
+            return
+
+        # The worker processes read the video from where it was spooled
+        self.decoding_videos[(pk, filename)] = self.extract_frames(
+            file_data.path,
+            extraction_times,
+            self.get_labelled_times(json_video)
+        )
+
+    def should_spool_file(self, pk: int, filename: str) -> bool:
+        # Videos are spooled, as FFMPEG needs to read them from disk anyway, and
+        # spooling them while downloading saves writing them out again afterwards
+        file_type, _ = self.get_file_metadata(pk, filename)
+
+        return file_type is not None and file_type.get('length', None) is not None
+
     def read_annotations(
             self,
             pk: int,
             filename: str,
-            file_data: bytes,
+            file_data: FileData,
             then: ThenFunction[ImageObjectDetectionInstance]
     ):
         for image, annotations in self.get_instances(pk, filename, file_data):
@@ -205,33 +386,83 @@ class UFDLImageObjectDetectionReader(UFDLReader[ImageObjectDetectionInstance]):
 
         return located_object
 
+    def get_annotations_file(self, pk: int) -> RawJSONObject:
+        """
+        Gets the annotations of every file in a dataset, retrieving them from
+        the server in a single request the first time they are needed.
+
+        :param pk:  The primary key of the dataset.
+        :return:    The raw JSON annotations file, mapping filenames to their
+                    file-type and annotations.
+        """
+        # Get the cache
+        annotations_cache = self.annotations_cache
+
+        with self.annotations_cache_lock:
+            # Download the annotations for this data-set if we haven't already
+            if pk not in annotations_cache:
+                with self.perf.timed("get_annotations"):
+                    annotations_cache[pk] = dataset.get_annotations(self.ufdl_context, pk)
+
+            return annotations_cache[pk]
+
+    def get_file_metadata(self, pk: int, filename: str) -> Tuple[Optional[RawJSONObject], RawJSONArray]:
+        """
+        Gets the file-type and annotations of a file.
+
+        :param pk:          The primary key of the dataset containing the file.
+        :param filename:    The filename of the file in the dataset.
+        :return:            The file-type (None if not set) and the annotations for the file.
+        """
+        # Files without a file-type set have no entry in the annotations file
+        file_annotations = self.get_annotations_file(pk).get(filename, None)
+        if file_annotations is None:
+            return None, []
+
+        # The file-type is the rest of the entry besides the annotations
+        file_type = {
+            key: value
+            for key, value in file_annotations.items()
+            if key != 'annotations'
+        }
+
+        return file_type, file_annotations.get('annotations', [])
+
     def get_instances(
             self,
             pk: int,
             filename: str,
-            file_data: bytes
+            file_data: Optional[FileData]
     ) -> Iterator[Tuple[Image, List[ImageAnnotation]]]:
-        # Get the file type
-        file_type = dataset.get_file_type(self.ufdl_context, pk, filename)
+        # Get the file type and annotations
+        file_type, annotations = self.get_file_metadata(pk, filename)
 
         # If the file-type hasn't been set, skip this file
         if file_type is None:
             return
 
-        # Get the annotations
-        annotations = dataset.get_annotations_for_file(self.ufdl_context, pk, filename)
-
         if file_type.get('length', None) is None:
-            yield self.get_image_instance(filename, file_data, file_type, annotations)
+            # Images are held in memory, so read them back if they were spooled
+            if isinstance(file_data, SpooledFile):
+                file_data = file_data.read()
+            yield self.get_image_instance(
+                filename,
+                file_data,
+                file_type,
+                annotations,
+                # In annotations-only mode, only download the image if its data is accessed
+                self.get_data_fetcher(pk, filename) if file_data is None else None
+            )
         else:
-            yield from self.get_video_frame_instances(filename, file_data, file_type, annotations)
+            yield from self.get_video_frame_instances(pk, filename, file_data, file_type, annotations)
 
     @staticmethod
     def get_image_instance(
             filename: str,
-            file_data: bytes,
+            file_data: Optional[bytes],
             file_type: RawJSONObject,
-            annotations: RawJSONArray
+            annotations: RawJSONArray,
+            fetch_data: Optional[Callable[[], bytes]] = None
     ) -> Tuple[Image, List[ImageAnnotation]]:
         # Parse the raw JSON
         json_image: JSONImage = JSONImage.from_raw_json(
@@ -257,32 +488,320 @@ class UFDLImageObjectDetectionReader(UFDLReader[ImageObjectDetectionInstance]):
                 file_data,
                 format,
                 dimensions
+            ) if fetch_data is None else LazyImage(
+                fetch_data,
+                filename,
+                None,
+                format,
+                dimensions
             ),
             json_image.annotations
         )
 
     def get_video_frame_instances(
             self,
+            pk: int,
             filename: str,
-            file_data: bytes,
+            file_data: Optional[FileData],
             file_type: RawJSONObject,
             annotations: RawJSONArray
     ) -> Iterator[Tuple[Image, List[ImageAnnotation]]]:
         # Parse the raw JSON
-        json_video: JSONVideo = JSONVideo.from_raw_json(
+        json_video = self.parse_video(file_type, annotations)
+
+        # Get the timestamps to extract
+        extraction_times = self.get_extraction_times(pk, filename, json_video)
+
+        # If there are no frames to extract, skip this video
+        if len(extraction_times) == 0:
+            return
+
+        # Group the annotations by frame-time (as image-annotations)
+        frame_annotations: Dict[float, List[ImageAnnotation]] = {}
+        for annotation in json_video.annotations:
+            frame_annotation_list = frame_annotations.get(annotation.time)
+            if frame_annotation_list is None:
+                frame_annotation_list = []
+                frame_annotations[annotation.time] = frame_annotation_list
+            frame_annotation_list.append(annotation.to_image_annotation())
+
+        # In annotations-only mode, only download and decode the video if a frame's data is accessed
+        if file_data is None:
+            yield from self.create_lazy_frame_instances(pk, filename, json_video, extraction_times, frame_annotations)
+            return
+
+        # If the video is already being decoded in the decode pool, use its frames
+        decoding_frames = self.decoding_videos.pop((pk, filename), None)
+        if decoding_frames is not None:
+            yield from self.create_frame_instances(pk, filename, decoding_frames, frame_annotations)
+            return
+
+        # Extract the frames straight from the file the video was spooled to
+        frames = self.extract_frames(file_data.path, extraction_times, frame_annotations.keys())
+
+        yield from self.create_frame_instances(pk, filename, frames, frame_annotations)
+
+    def extract_frames(
+            self,
+            video_filename: str,
+            extraction_times: np.ndarray,
+            labelled_times: Collection[float]
+    ) -> Iterator[EncodedFrame]:
+        """
+        Extracts the frames of a video at the given times, reading any frames extracted
+        by a previous run from the frame cache and only decoding the rest. Decoding is
+        started before this method returns, so it can be called ahead of reading the
+        video to start decoding it in the decode pool.
+
+        :param video_filename:      The video file on disk.
+        :param extraction_times:    The times of the frames to extract.
+        :param labelled_times:      The times of the labelled frames, which are
+                                    always extracted (see snap_to_frames).
+        :return:                    An iterator of encoded frames, in ascending time order.
+        """
+        frame_cache = self.frame_cache
+
+        if frame_cache is None:
+            return self.decode_frames(video_filename, extraction_times, labelled_times)
+
+        # Map the times to frames, using the frame-rate cached from a previous run if there is one
+        video_hash = frame_cache.hash_video(video_filename)
+        video_info = frame_cache.get_video_info(video_hash)
+        fps = video_info[0] if video_info is not None else get_frame_rate(video_filename)
+        times = snap_to_frames(extraction_times, fps, labelled_times)
+        indices = frame_indices(times, fps).tolist()
+        times = times.tolist()
+
+        # Read the frames that are cached (which can only be used if their dimensions are known)
+        cached_frames: Dict[float, bytes] = {}
+        if video_info is not None:
+            for frame_time, index in zip(times, indices):
+                frame_data = frame_cache.get_frame(video_hash, index)
+                if frame_data is not None:
+                    cached_frames[frame_time] = frame_data
+
+        # Start decoding the rest
+        missing_times = [frame_time for frame_time in times if frame_time not in cached_frames]
+        decoded_frames = (
+            self.decode_frames(video_filename, missing_times, labelled_times) if len(missing_times) > 0
+            else iter(())
+        )
+
+        return self.merge_cached_frames(
+            frame_cache,
+            video_hash,
+            fps,
+            video_info[1] if video_info is not None else None,
+            zip(times, indices),
+            cached_frames,
+            decoded_frames
+        )
+
+    @staticmethod
+    def merge_cached_frames(
+            frame_cache: FrameCache,
+            video_hash: str,
+            fps: float,
+            dimensions: Optional[Tuple[int, int]],
+            times_and_indices: Iterable[Tuple[float, int]],
+            cached_frames: Dict[float, bytes],
+            decoded_frames: Iterator[EncodedFrame]
+    ) -> Iterator[EncodedFrame]:
+        """
+        Merges the frames of a video read from the frame cache with those being decoded,
+        adding the decoded frames to the cache.
+
+        :param frame_cache:         The frame cache.
+        :param video_hash:          The hash of the video's contents.
+        :param fps:                 The frame-rate of the video.
+        :param dimensions:          The dimensions of the video's frames, if known.
+        :param times_and_indices:   The time and frame index of each frame, in ascending time order.
+        :param cached_frames:       The frames read from the cache, by time.
+        :param decoded_frames:      The other frames, being decoded in ascending time order.
+        :return:                    An iterator of encoded frames, in ascending time order.
+        """
+        for frame_time, index in times_and_indices:
+            frame_data = cached_frames.get(frame_time, None)
+            if frame_data is not None:
+                yield frame_time, frame_data, dimensions
+                continue
+
+            frame = next(decoded_frames)
+
+            # Cache the video's details along with its first decoded frame
+            if dimensions is None:
+                dimensions = frame[2]
+                frame_cache.put_video_info(video_hash, fps, dimensions)
+
+            frame_cache.put_frame(video_hash, index, frame[1])
+
+            yield frame
+
+    def decode_frames(
+            self,
+            video_filename: str,
+            times: Iterable[float],
+            labelled_times: Collection[float]
+    ) -> Iterator[EncodedFrame]:
+        """
+        Decodes the frames of a video at the given times, in the decode pool if enabled
+        or otherwise in the reading thread.
+
+        :param video_filename:  The video file on disk.
+        :param times:           The times of the frames to decode.
+        :param labelled_times:  The times of the labelled frames.
+        :return:                An iterator of encoded frames, in ascending time order.
+        """
+        if self.video_decode_pool is not None:
+            return self.video_decode_pool.submit(
+                video_filename,
+                times,
+                self.max_frame_skip,
+                self.frame_format,
+                self.frame_quality,
+                labelled_times
+            )
+
+        return iterate_video_frames(
+            video_filename,
+            times,
+            self.max_frame_skip,
+            self.frame_format,
+            self.frame_quality,
+            labelled_times
+        )
+
+    def create_frame_instances(
+            self,
+            pk: int,
+            filename: str,
+            frames: Iterable[EncodedFrame],
+            frame_annotations: Dict[float, List[ImageAnnotation]]
+    ) -> Iterator[Tuple[Image, List[ImageAnnotation]]]:
+        """
+        Creates the instances for the extracted frames of a video.
+
+        :param pk:                  The primary key of the dataset containing the video.
+        :param filename:            The filename of the video.
+        :param frames:              The encoded frames extracted from the video.
+        :param frame_annotations:   The image-annotations for each labelled frame-time.
+        :return:                    An iterator of images and their annotations.
+        """
+        if self.perf.enabled:
+            frames = self.time_frame_extraction(frames)
+
+        for frame_time, frame_data, frame_dimensions in frames:
+            # Create an image descriptor for the frame
+            image = Image(
+                self.get_frame_filename(filename, frame_time),
+                frame_data,
+                self.frame_format,
+                frame_dimensions
+            )
+
+            yield image, frame_annotations.get(frame_time, [])
+
+            # The frame has been forwarded by the time we are resumed, so record it as read
+            self.checkpoint_frame(pk, filename, frame_time)
+
+    def time_frame_extraction(self, frames: Iterable[EncodedFrame]) -> Iterator[EncodedFrame]:
+        """
+        Records the time spent waiting for each frame of a video to be decoded and encoded.
+
+        :param frames:  The encoded frames extracted from the video.
+        :return:        The same frames.
+        """
+        frames = iter(frames)
+
+        while True:
+            start = time.perf_counter()
+            frame = next(frames, None)
+
+            if frame is None:
+                return
+
+            self.perf.record("frame_extraction", time.perf_counter() - start, len(frame[1]))
+
+            yield frame
+
+    def create_lazy_frame_instances(
+            self,
+            pk: int,
+            filename: str,
+            json_video: JSONVideo,
+            extraction_times: np.ndarray,
+            frame_annotations: Dict[float, List[ImageAnnotation]]
+    ) -> Iterator[Tuple[Image, List[ImageAnnotation]]]:
+        """
+        Creates the instances for the frames to extract from a video, without
+        downloading the video unless the data of one of the frames is accessed.
+
+        :param pk:                  The primary key of the dataset containing the video.
+        :param filename:            The filename of the video.
+        :param json_video:          The parsed video.
+        :param extraction_times:    The times of the frames to extract.
+        :param frame_annotations:   The image-annotations for each labelled frame-time.
+        :return:                    An iterator of images and their annotations.
+        """
+        video = LazyVideo(
+            self.get_file_spooler(pk, filename),
+            self.max_frame_skip,
+            self.frame_format,
+            self.frame_quality
+        )
+
+        # The frames have the dimensions of the video
+        dimensions = json_video.dimensions if json_video.dimensions is not Absent else None
+
+        for frame_time in extraction_times.tolist():
+            image = LazyImage(
+                partial(video.get_frame, frame_time),
+                self.get_frame_filename(filename, frame_time),
+                None,
+                self.frame_format,
+                dimensions
+            )
+
+            yield image, frame_annotations.get(frame_time, [])
+
+            # The frame has been forwarded by the time we are resumed, so record it as read
+            self.checkpoint_frame(pk, filename, frame_time)
+
+    def get_frame_filename(self, filename: str, frame_time: float) -> str:
+        """
+        Creates an augmented filename for a frame of a video.
+
+        :param filename:    The filename of the video.
+        :param frame_time:  The time of the frame.
+        :return:            The filename for the frame.
+        """
+        return format_frame_filename(filename, frame_time, self.frame_format)
+
+    @staticmethod
+    def parse_video(file_type: RawJSONObject, annotations: RawJSONArray) -> JSONVideo:
+        """
+        Parses the file-type and annotations of a video.
+
+        :param file_type:       The raw JSON file-type of the video.
+        :param annotations:     The raw JSON annotations of the video.
+        :return:                The parsed video.
+        """
+        return JSONVideo.from_raw_json(
             {
                 **file_type,
                 'annotations': annotations
             }
         )
 
-        # Extract the format and dimensions
-        format = ImageFormat.for_extension("jpg")  # We always extract frames as JPGs
-        dimensions = (
-            json_video.dimensions if json_video.dimensions is not Absent
-            else None
-        )
+    def get_extraction_times(self, pk: int, filename: str, json_video: JSONVideo) -> np.ndarray:
+        """
+        Gets the times of the frames to extract from a video.
 
+        :param pk:          The primary key of the dataset containing the video.
+        :param filename:    The filename of the video.
+        :param json_video:  The parsed video.
+        :return:            The schedule of frame-times to extract, in ascending order.
+        """
         # Get the unlabelled extraction specifiers that correspond to this video
         unlabelled_extractors = [
             extractor
@@ -290,65 +809,25 @@ class UFDLImageObjectDetectionReader(UFDLReader[ImageObjectDetectionInstance]):
             if extractor.spec.matches_filename(filename)
         ] if self.extract_unlabelled is not None else []
 
-        # Create a set of timestamps to extract (of unlabelled frames)
-        extraction_times = set(
-            time
-            for extractor in unlabelled_extractors
-            for time in extractor.spec.get_times(json_video.length)
+        # Merge the timestamps of unlabelled frames from each specifier with the labelled frame-times
+        extraction_times = plan_extraction_times(
+            [extractor.spec.get_times(json_video.length) for extractor in unlabelled_extractors]
+            + [self.get_labelled_times(json_video)]
         )
 
-        # Add the labelled frame-times as well
-        extraction_times.update(
-            annotation.time
-            for annotation in json_video.annotations
-        )
+        # Skip the frames read by a previous run
+        resume_frame_time = self.get_resume_frame_time(pk, filename)
+        if resume_frame_time is not None:
+            extraction_times = extraction_times[extraction_times > resume_frame_time]
 
-        # If there are no frames to extract, skip this video
-        if len(extraction_times) == 0:
-            return
+        return extraction_times
 
-        # Group the annotations by frame-time (as image-annotations)
-        frame_annotations: Dict[float, List[ImageAnnotation]] = {}
-        for annotation in json_video.annotations:
-            frame_annotation_list = frame_annotations.get(annotation.time)
-            if frame_annotation_list is None:
-                frame_annotation_list = []
-                frame_annotations[annotation.time] = frame_annotation_list
-            frame_annotation_list.append(annotation.to_image_annotation())
-
-        # We need to write the video data to disk so that FFMPEG can read it,
-        # so do so in a temporary file
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            # Create a name for the temporary copy of the video data
-            video_filename = os.path.join(tmp_dir, "video")
-
-            # Copy the video data to a temporary file
-            with open(video_filename, "wb") as tmp_video_file:
-                tmp_video_file.write(file_data)
-
-            # Open the video with FFMPEG
-            with VideoFileClip(video_filename, audio=False) as video_clip:
-                # Create images
-                for frame_time in extraction_times:
-                    # Create an augmented filename for this frame of the video
-                    augmented_filename = f"{filename}@|frametime={frame_time}|.jpg"
-
-                    # Create a temporary filename to store the frame image under
-                    tmp_image_filename = os.path.join(tmp_dir, "image.jpg")
-
-                    # Save the frame as a temporary JPEG
-                    video_clip.save_frame(tmp_image_filename, frame_time, False)
-
-                    # Read the image data back in to memory
-                    with open(tmp_image_filename, "rb") as tmp_image_file:
-                        frame_data = tmp_image_file.read()
-
-                    # Create an image descriptor for the frame
-                    image = Image(
-                        augmented_filename,
-                        frame_data,
-                        format,
-                        dimensions
-                    )
+    @staticmethod
+    def get_labelled_times(json_video: JSONVideo) -> List[float]:
+        """
+        Gets the times of the frames of a video which have annotations.
 
-                    yield image, frame_annotations.get(frame_time, [])
+        :param json_video:  The parsed video.
+        :return:            The labelled frame-times.
+        """
+        return [annotation.time for annotation in json_video.annotations]
@@ -1,6 +1,10 @@
-from typing import Optional, Dict, Set
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
 
-from ufdl.json.object_detection import ImageAnnotation, Polygon
+from ufdl.json.object_detection import ImageAnnotation, Polygon, VideoAnnotation
 
 from ufdl.pythonclient.functional.object_detection import dataset
 
@@ -9,67 +13,251 @@ from wai.annotations.domain.image.object_detection import ImageObjectDetectionIn
 from wai.annotations.domain.image.object_detection.util import get_object_prefix, get_object_label
 
 from wai.common.adams.imaging.locateobjects import LocatedObject
+from wai.common.cli.options import TypedOption
 
 from wai.json.object import Absent
 
 from ....common.component import UFDLWriter
 from ....common.component.util import DatasetMethods
+from ..util import parse_frame_filename, probe_video
 
 
 class UFDLImageObjectDetectionWriter(UFDLWriter[ImageObjectDetectionInstance]):
     """
     Writes instances to a data-set on a UFDL server.
     """
-    existing_files_cache: Dict[int, Set[str]] = ProcessState(lambda self: {})
+    videos_dir: Optional[str] = TypedOption(
+        "--videos-dir",
+        type=str,
+        help="a directory containing the original videos of any video frames being written (as named "
+             "by the object-detection reader), so that the videos are uploaded with the annotations of "
+             "all their frames, instead of uploading each frame as an image",
+        metavar="DIR"
+    )
+
+    # The annotations of each frame of the videos being written, keyed by dataset and video filename
+    pending_videos: Dict[Tuple[int, str], Dict[float, List[ImageAnnotation]]] = ProcessState(lambda self: {})
+
+    # Guards the pending videos, as they are added to by the upload workers
+    pending_videos_lock: threading.Lock = ProcessState(lambda self: threading.Lock())
+
+    def consume_element_for_split(self, element: ImageObjectDetectionInstance):
+        # Create the shared state before any upload workers can access it
+        self.pending_videos_lock
+
+        super().consume_element_for_split(element)
+
+    def finish_split(self):
+        super().finish_split()
+
+        # Upload the videos whose frames were written in this split
+        self.upload_videos()
+
+    def sync_to_dataset(self, element: ImageObjectDetectionInstance, dataset_pk: int, subfolder: Optional[str]):
+        # Frames of videos are collected until the end of the split, and synced as part of their video
+        if self.videos_dir is not None:
+            frame = parse_frame_filename(self.format_filename(element, subfolder))
+            if frame is not None:
+                self.add_video_frame(dataset_pk, *frame, element)
+                return
+
+        super().sync_to_dataset(element, dataset_pk, subfolder)
 
     def get_dataset_methods(self) -> DatasetMethods:
         return dataset.list, dataset.create, dataset.copy
 
+    def get_annotations_fingerprint(self, element: ImageObjectDetectionInstance) -> str:
+        if element.annotations is None:
+            return ""
+
+        return json.dumps(
+            [self.annotation_from_located_object(located_object).to_raw_json() for located_object in element.annotations],
+            sort_keys=True
+        )
+
     def write_to_dataset(
             self,
             element: ImageObjectDetectionInstance,
             dataset_pk: int,
             subfolder: Optional[str]
     ):
-        # Get the existing files cache
-        existing_files_cache = self.existing_files_cache
-
-        if dataset_pk not in existing_files_cache:
-            existing_files_cache[dataset_pk] = set(dataset.retrieve(self.ufdl_context, dataset_pk)['files'])
+        # Get the files already in the dataset
+        existing_files = self.get_existing_files(dataset_pk)
 
         # Format the file-name with the folder
-        filename = element.data.filename if subfolder is None else f"{subfolder}/{element.data.filename}"
+        filename = self.format_filename(element, subfolder)
 
         # If this file already exists, delete it
-        if filename in existing_files_cache[dataset_pk]:
-            dataset.delete_file(self.ufdl_context, dataset_pk, filename)
+        if filename in existing_files:
+            with self.perf.timed("delete_file"):
+                dataset.delete_file(self.ufdl_context, dataset_pk, filename)
 
         # Upload the file data
-        dataset.add_file(self.ufdl_context, dataset_pk, filename, element.data.data)
+        with self.perf.timed("add_file", len(element.data.data)):
+            dataset.add_file(self.ufdl_context, dataset_pk, filename, element.data.data)
 
         # Add the filename to the cache
-        existing_files_cache[dataset_pk].add(filename)
+        existing_files.add(filename)
 
         # Set the file-type for the file
-        dataset.set_file_type(
-            self.ufdl_context,
-            dataset_pk,
-            filename,
-            str(element.data.format),
-            element.data.width,
-            element.data.height,
-            None  # TODO: Only handles images for the time being
-        )
+        with self.perf.timed("set_file_type"):
+            dataset.set_file_type(
+                self.ufdl_context,
+                dataset_pk,
+                filename,
+                str(element.data.format),
+                element.data.width,
+                element.data.height,
+                None  # TODO: Only handles images for the time being
+            )
 
         # Upload the annotations
         if element.annotations is not None:
-            dataset.set_annotations_for_file(
+            with self.perf.timed("set_annotations_for_file"):
+                dataset.set_annotations_for_file(
+                    self.ufdl_context,
+                    dataset_pk,
+                    filename,
+                    list(map(self.annotation_from_located_object, element.annotations))
+                )
+
+    def add_video_frame(
+            self,
+            dataset_pk: int,
+            video_filename: str,
+            frame_time: float,
+            element: ImageObjectDetectionInstance
+    ):
+        """
+        Adds the annotations of a frame to those of its video, to be uploaded
+        at the end of the split. May be called from an upload worker thread.
+
+        :param dataset_pk:      The primary key of the dataset to write the video to.
+        :param video_filename:  The filename of the video in the dataset.
+        :param frame_time:      The time of the frame in the video.
+        :param element:         The frame instance.
+        """
+        annotations = (
+            list(map(self.annotation_from_located_object, element.annotations))
+            if element.annotations is not None
+            else []
+        )
+
+        with self.pending_videos_lock:
+            frames = self.pending_videos.setdefault((dataset_pk, video_filename), {})
+            frames.setdefault(frame_time, []).extend(annotations)
+
+    def upload_videos(self):
+        """
+        Uploads the videos whose frames have been written, along with the
+        annotations of all of their frames.
+        """
+        with self.pending_videos_lock:
+            pending_videos = list(self.pending_videos.items())
+            self.pending_videos.clear()
+
+        if self.upload_executor is None:
+            for (dataset_pk, video_filename), frames in pending_videos:
+                self.upload_video(dataset_pk, video_filename, frames)
+        else:
+            uploads = [
+                self.upload_executor.submit(self.upload_video, dataset_pk, video_filename, frames)
+                for (dataset_pk, video_filename), frames in pending_videos
+            ]
+            for upload in uploads:
+                upload.result()
+
+    def upload_video(self, dataset_pk: int, filename: str, frames: Dict[float, List[ImageAnnotation]]):
+        """
+        Uploads a video from the videos directory, streaming it from disk, and sets
+        the annotations of all its frames in a single request. The video is skipped
+        if the sync manifest shows it and its annotations are unchanged.
+
+        :param dataset_pk:  The primary key of the dataset to write the video to.
+        :param filename:    The filename of the video in the dataset.
+        :param frames:      The annotations of each of the video's frames, by frame-time.
+        """
+        # Videos in sub-folders (i.e. splits) are looked up by their name alone
+        video_path = os.path.join(self.videos_dir, os.path.basename(filename))
+        if not os.path.isfile(video_path):
+            raise Exception(f"Video '{filename}' not found in {self.videos_dir}")
+
+        # Convert the frame annotations into annotations of the video
+        annotations = [
+            VideoAnnotation.from_raw_json({**annotation.to_raw_json(), "time": frame_time})
+            for frame_time, frame_annotations in sorted(frames.items())
+            for annotation in frame_annotations
+        ]
+
+        # Skip the video if it is unchanged since it was last uploaded
+        existing_files = self.get_existing_files(dataset_pk)
+        sync_manifest = self.sync_manifest
+        if sync_manifest is not None:
+            record = (
+                self.hash_file(video_path),
+                hashlib.sha256(
+                    json.dumps([annotation.to_raw_json() for annotation in annotations], sort_keys=True).encode("utf-8")
+                ).hexdigest()
+            )
+            if (
+                    sync_manifest.get(self.get_sync_key(dataset_pk), filename) == record
+                    and (self.resume or filename in existing_files)
+            ):
+                self._count_upload("skipped")
+                return
+
+        is_existing = filename in existing_files
+
+        # If this video already exists, delete it
+        if is_existing:
+            with self.perf.timed("delete_file"):
+                dataset.delete_file(self.ufdl_context, dataset_pk, filename)
+
+        # Stream the video from disk
+        with self.perf.timed("add_file", os.path.getsize(video_path)), open(video_path, "rb") as video_file:
+            dataset.add_file(self.ufdl_context, dataset_pk, filename, video_file)
+
+        # Add the filename to the cache
+        existing_files.add(filename)
+
+        # Set the file-type for the video
+        _, (width, height), length = probe_video(video_path)
+        with self.perf.timed("set_file_type"):
+            dataset.set_file_type(
                 self.ufdl_context,
                 dataset_pk,
                 filename,
-                list(map(self.annotation_from_located_object, element.annotations))
+                os.path.splitext(filename)[1][1:].lower(),
+                width,
+                height,
+                length
             )
 
+        # Upload the annotations of all the frames at once
+        with self.perf.timed("set_annotations_for_file"):
+            dataset.set_annotations_for_file(self.ufdl_context, dataset_pk, filename, annotations)
+
+        self._count_upload("updated" if is_existing else "new")
+
+        if sync_manifest is not None:
+            sync_manifest.record(self.get_sync_key(dataset_pk), filename, *record)
+
+    @staticmethod
+    def hash_file(path: str) -> str:
+        """
+        Hashes the contents of a file on disk, without reading it all into memory.
+
+        :param path:    The path to the file.
+        :return:        The hex-digest of the file's contents.
+        """
+        digest = hashlib.sha256()
+
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                digest.update(chunk)
+
+        return digest.hexdigest()
+
     @staticmethod
     def annotation_from_located_object(located_object: LocatedObject) -> ImageAnnotation:
         """
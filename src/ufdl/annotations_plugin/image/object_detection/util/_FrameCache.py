@@ -0,0 +1,114 @@
+import hashlib
+import json
+from typing import Optional, Tuple
+
+from wai.annotations.domain.image import ImageFormat
+
+from ....common.util import FileCache
+
+
+class FrameCache:
+    """
+    A persistent cache of the encoded frames extracted from videos, keyed by the
+    hash of the video's contents, the index of the frame and the encoding of the
+    frame, so that frames extracted in a previous run needn't be decoded again.
+    The frame-rate and frame dimensions of each video are cached alongside its
+    frames, so that requested times can be mapped to frame indices without opening
+    the video. Stored in a size-bounded file cache.
+    """
+    # The size of the chunks to read videos in when hashing them
+    HASH_CHUNK_SIZE: int = 1024 * 1024
+
+    def __init__(self, file_cache: FileCache, frame_format: ImageFormat, frame_quality: int):
+        """
+        :param file_cache:      The cache to store the frames in.
+        :param frame_format:    The image format the frames are encoded in.
+        :param frame_quality:   The encoding quality of the frames.
+        """
+        self._file_cache: FileCache = file_cache
+        self._encoding: str = f"{frame_format}|{frame_quality}"
+
+    @staticmethod
+    def hash_video(video_filename: str) -> str:
+        """
+        Hashes the contents of a video.
+
+        :param video_filename:  The video file on disk.
+        :return:                The hex-digest of the video's contents.
+        """
+        digest = hashlib.sha256()
+
+        with open(video_filename, "rb") as file:
+            for chunk in iter(lambda: file.read(FrameCache.HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+
+        return digest.hexdigest()
+
+    def get_video_info(self, video_hash: str) -> Optional[Tuple[float, Tuple[int, int]]]:
+        """
+        Gets the frame-rate and frame dimensions of a video.
+
+        :param video_hash:  The hash of the video's contents.
+        :return:            The frame-rate and (width, height) of the video, or
+                            None if they aren't cached.
+        """
+        data = self._read(f"video|{video_hash}")
+
+        if data is None:
+            return None
+
+        info = json.loads(data)
+
+        return info["fps"], tuple(info["dimensions"])
+
+    def put_video_info(self, video_hash: str, fps: float, dimensions: Tuple[int, int]):
+        """
+        Caches the frame-rate and frame dimensions of a video.
+
+        :param video_hash:  The hash of the video's contents.
+        :param fps:         The frame-rate of the video.
+        :param dimensions:  The (width, height) of the video's frames.
+        """
+        info = {"fps": fps, "dimensions": list(dimensions)}
+        self._file_cache.put(f"video|{video_hash}", (json.dumps(info).encode("utf-8"),))
+
+    def get_frame(self, video_hash: str, frame_index: int) -> Optional[bytes]:
+        """
+        Gets an encoded frame of a video.
+
+        :param video_hash:      The hash of the video's contents.
+        :param frame_index:     The index of the frame in the video.
+        :return:                The encoded frame, or None if it isn't cached.
+        """
+        return self._read(self._frame_key(video_hash, frame_index))
+
+    def put_frame(self, video_hash: str, frame_index: int, frame_data: bytes):
+        """
+        Caches an encoded frame of a video.
+
+        :param video_hash:      The hash of the video's contents.
+        :param frame_index:     The index of the frame in the video.
+        :param frame_data:      The encoded frame.
+        """
+        self._file_cache.put(self._frame_key(video_hash, frame_index), (frame_data,))
+
+    def _frame_key(self, video_hash: str, frame_index: int) -> str:
+        return f"frame|{video_hash}|{frame_index}|{self._encoding}"
+
+    def _read(self, key: str) -> Optional[bytes]:
+        """
+        Reads the contents of a cached file.
+
+        :param key:     The key of the file.
+        :return:        The contents of the file, or None if it isn't cached.
+        """
+        path = self._file_cache.get(key)
+
+        if path is None:
+            return None
+
+        try:
+            with open(path, "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None  # Evicted since it was found
@@ -0,0 +1,80 @@
+import threading
+import weakref
+from typing import Callable, Optional
+
+from moviepy.video.io.VideoFileClip import VideoFileClip
+
+from wai.annotations.domain.image import ImageFormat
+
+from ....common.util import SpooledFile
+from ._encode_frame import encode_frame
+from ._read_frames_in_order import read_frames_in_order
+
+
+class LazyVideo:
+    """
+    A video which isn't downloaded until one of its frames is first required,
+    for creating frame instances whose data is fetched lazily. Once downloaded,
+    the video is kept on disk and its decoder kept open until this object is
+    garbage-collected, so frames requested in time order are decoded in a single
+    forward pass rather than re-opening the video for each one.
+    """
+    def __init__(
+            self,
+            fetch_file: Callable[[], SpooledFile],
+            max_skip_frames: int,
+            frame_format: ImageFormat,
+            frame_quality: int
+    ):
+        """
+        :param fetch_file:          Downloads the video to disk.
+        :param max_skip_frames:     The largest gap (in frames) to read through rather than seek.
+        :param frame_format:        The image format to encode the frames in.
+        :param frame_quality:       The encoding quality for lossy formats.
+        """
+        self._fetch_file: Callable[[], SpooledFile] = fetch_file
+        self._max_skip_frames: int = max_skip_frames
+        self._frame_format: ImageFormat = frame_format
+        self._frame_quality: int = frame_quality
+        self._spooled_file: Optional[SpooledFile] = None
+        self._video_clip: Optional[VideoFileClip] = None
+        self._lock = threading.Lock()
+
+    def get_frame(self, time: float) -> bytes:
+        """
+        Decodes the frame of the video at the given time.
+
+        :param time:    The time (in seconds) of the frame.
+        :return:        The encoded frame.
+        """
+        # The decoder's position is shared, so frames are decoded one at a time
+        with self._lock:
+            # Download and open the video the first time a frame is required
+            if self._video_clip is None:
+                self._spooled_file = self._fetch_file()
+                self._video_clip = VideoFileClip(self._spooled_file.path, audio=False)
+
+                # Stop FFMPEG and release the spooled video once the frames are no longer required
+                weakref.finalize(self, _close, self._video_clip, self._spooled_file)
+
+            frame = None
+            for _, frame in read_frames_in_order(self._video_clip.reader, (time,), self._max_skip_frames):
+                break
+
+        if frame is None:
+            raise Exception(f"No frame at time {time}")
+
+        return encode_frame(frame, self._frame_format, self._frame_quality)
+
+
+def _close(video_clip: VideoFileClip, spooled_file: SpooledFile):
+    """
+    Closes a lazy video's decoder, then its spooled file.
+
+    :param video_clip:      The video's decoder.
+    :param spooled_file:    The file the video was downloaded to.
+    """
+    try:
+        video_clip.close()
+    finally:
+        spooled_file.close()
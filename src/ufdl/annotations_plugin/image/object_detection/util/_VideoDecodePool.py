@@ -0,0 +1,154 @@
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import Manager
+from queue import Empty, Queue
+from typing import Collection, Iterable, Iterator, List
+
+from wai.annotations.domain.image import ImageFormat
+
+from ._iterate_video_frames import EncodedFrame, iterate_video_frames
+
+
+class VideoDecodePool:
+    """
+    A pool of worker processes which decode videos in parallel. The encoded frames
+    of each video are streamed back to the main process through a bounded queue, so
+    workers can't decode too far ahead of the frames being consumed. The worker
+    processes are reused for every video submitted to the pool, and videos are
+    decoded in the order they are submitted, so their frames should be consumed
+    in that order too.
+    """
+    def __init__(self, workers: int, queue_size: int = 64, frame_timeout: float = 300.0):
+        """
+        :param workers:         The number of worker processes.
+        :param queue_size:      The maximum number of decoded frames to buffer per video.
+        :param frame_timeout:   The longest time (in seconds) to wait for a video which
+                                is being decoded to produce its next frame.
+        """
+        # The manager hosts the queues shared between the worker processes and the main process
+        self._manager = Manager()
+        self._executor = ProcessPoolExecutor(workers)
+        self._queue_size: int = queue_size
+        self._frame_timeout: float = frame_timeout
+
+        # The decoding tasks which may not have finished yet
+        self._futures: List[Future] = []
+
+    def submit(
+            self,
+            video_filename: str,
+            times: Iterable[float],
+            max_skip_frames: int,
+            frame_format: ImageFormat,
+            frame_quality: int,
+            keep_times: Collection[float] = ()
+    ) -> Iterator[EncodedFrame]:
+        """
+        Starts decoding a video in the pool. Arguments are as for iterate_video_frames.
+
+        :return:    An iterator of the video's encoded frames, in ascending time order.
+        """
+        queue = self._manager.Queue(self._queue_size)
+
+        future = self._executor.submit(
+            _decode_video_frames_into_queue,
+            queue,
+            video_filename,
+            list(times),
+            max_skip_frames,
+            frame_format,
+            frame_quality,
+            list(keep_times)
+        )
+
+        self._futures = [submitted for submitted in self._futures if not submitted.done()]
+        self._futures.append(future)
+
+        return _iterate_queued_frames(future, queue, self._frame_timeout)
+
+    def shutdown(self):
+        """
+        Stops the worker processes. Videos which haven't started decoding are
+        cancelled, and workers blocked on a full queue are released by shutting
+        down the manager first.
+        """
+        for future in self._futures:
+            future.cancel()
+
+        self._manager.shutdown()
+        self._executor.shutdown()
+
+
+def _decode_video_frames_into_queue(
+        queue: Queue,
+        video_filename: str,
+        times: List[float],
+        max_skip_frames: int,
+        frame_format: ImageFormat,
+        frame_quality: int,
+        keep_times: List[float]
+):
+    """
+    Decodes the frames of a video into a queue, in a worker process. A None is
+    placed on the queue when decoding is finished (successfully or not).
+    """
+    try:
+        for frame in iterate_video_frames(
+                video_filename,
+                times,
+                max_skip_frames,
+                frame_format,
+                frame_quality,
+                keep_times
+        ):
+            queue.put(frame)
+    finally:
+        queue.put(None)
+
+
+def _iterate_queued_frames(future: Future, queue: Queue, frame_timeout: float) -> Iterator[EncodedFrame]:
+    """
+    Iterates over the frames decoded into a queue by a worker process.
+
+    :param future:          The future of the decoding task.
+    :param queue:           The queue the frames are being decoded into.
+    :param frame_timeout:   The longest time to wait for the next frame once decoding has started.
+    :return:                An iterator over the decoded frames.
+    """
+    try:
+        last_progress = time.monotonic()
+
+        while True:
+            try:
+                frame = queue.get(timeout=1.0)
+            except Empty:
+                if not future.done():
+                    # Waiting for a worker to become free doesn't count against the timeout
+                    if not future.running():
+                        last_progress = time.monotonic()
+                    elif time.monotonic() - last_progress > frame_timeout:
+                        raise TimeoutError(f"No frame was decoded from the video in {frame_timeout} seconds")
+                    continue
+
+                # If the task died without finishing the queue, raise its error
+                if future.exception() is not None:
+                    raise future.exception()
+
+                # The task may have finished the queue since we stopped waiting on it
+                try:
+                    frame = queue.get_nowait()
+                except Empty:
+                    raise Exception("Video decoding finished without completing its frames")
+
+            if frame is None:
+                break
+
+            last_progress = time.monotonic()
+
+            yield frame
+
+        # Raise any error that stopped the decoding early
+        future.result()
+    finally:
+        # Don't leave the video decoding if its frames are no longer wanted
+        future.cancel()
@@ -0,0 +1,11 @@
+"""
+Utilities for reading/writing object-detection datasets.
+"""
+from ._encode_frame import encode_frame
+from ._FrameCache import FrameCache
+from ._frame_filename import format_frame_filename, parse_frame_filename
+from ._iterate_video_frames import get_frame_rate, iterate_video_frames, EncodedFrame, probe_video
+from ._LazyVideo import LazyVideo
+from ._plan_extraction_times import frame_indices, plan_extraction_times, snap_to_frames, times_on_grid
+from ._read_frames_in_order import read_frames_in_order
+from ._VideoDecodePool import VideoDecodePool
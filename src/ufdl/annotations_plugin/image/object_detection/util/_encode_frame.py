@@ -0,0 +1,24 @@
+from io import BytesIO
+
+import numpy as np
+from PIL import Image as PILImage
+
+from wai.annotations.domain.image import ImageFormat
+
+
+def encode_frame(frame: np.ndarray, image_format: ImageFormat, quality: int) -> bytes:
+    """
+    Encodes a decoded video frame as an image, in memory.
+
+    :param frame:           The RGB frame data, as a (height, width, 3) array.
+    :param image_format:    The format to encode the frame in.
+    :param quality:         The encoding quality (1-100), for lossy formats.
+    :return:                The binary image data.
+    """
+    # Only lossy formats take a quality setting
+    save_options = {"quality": quality} if image_format is ImageFormat.JPG else {}
+
+    buffer = BytesIO()
+    PILImage.fromarray(frame.astype("uint8")).save(buffer, format=image_format.pil_format_string, **save_options)
+
+    return buffer.getvalue()
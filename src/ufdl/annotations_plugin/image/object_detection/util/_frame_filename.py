@@ -0,0 +1,38 @@
+import re
+from typing import Optional, Tuple
+
+from wai.annotations.domain.image import ImageFormat
+
+# Matches the filenames given to frames extracted from videos by format_frame_filename
+FRAME_FILENAME_REGEX = re.compile(r"^(?P<video>.+)@\|frametime=(?P<time>[^|]+)\|\.[^.]+$")
+
+
+def format_frame_filename(filename: str, frame_time: float, frame_format: ImageFormat) -> str:
+    """
+    Creates an augmented filename for a frame of a video.
+
+    :param filename:        The filename of the video.
+    :param frame_time:      The time of the frame.
+    :param frame_format:    The image format the frame is encoded in.
+    :return:                The filename for the frame.
+    """
+    return f"{filename}@|frametime={frame_time}|.{frame_format}"
+
+
+def parse_frame_filename(filename: str) -> Optional[Tuple[str, float]]:
+    """
+    Gets the video and time of a frame from its augmented filename.
+
+    :param filename:    The filename of the frame.
+    :return:            The filename of the video and the time of the frame, or
+                        None if the filename isn't that of a video frame.
+    """
+    match = FRAME_FILENAME_REGEX.match(filename)
+
+    if match is None:
+        return None
+
+    try:
+        return match.group("video"), float(match.group("time"))
+    except ValueError:
+        return None
@@ -0,0 +1,64 @@
+from typing import Collection, Iterable, Iterator, Tuple
+
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+from moviepy.video.io.VideoFileClip import VideoFileClip
+
+from wai.annotations.domain.image import ImageFormat
+
+from ._encode_frame import encode_frame
+from ._plan_extraction_times import snap_to_frames
+from ._read_frames_in_order import read_frames_in_order
+
+# An encoded video frame: the frame-time, the binary image data and the (width, height) dimensions
+EncodedFrame = Tuple[float, bytes, Tuple[int, int]]
+
+
+def iterate_video_frames(
+        video_filename: str,
+        times: Iterable[float],
+        max_skip_frames: int,
+        frame_format: ImageFormat,
+        frame_quality: int,
+        keep_times: Collection[float] = ()
+) -> Iterator[EncodedFrame]:
+    """
+    Decodes the frames of a video at the given times, and encodes them as images.
+    Times which fall on the same frame of the video are only extracted once (see
+    snap_to_frames).
+
+    :param video_filename:      The video file on disk.
+    :param times:               The times (in seconds) of the frames to decode.
+    :param max_skip_frames:     The largest gap (in frames) to read through rather than seek.
+    :param frame_format:        The image format to encode the frames in.
+    :param frame_quality:       The encoding quality for lossy formats.
+    :param keep_times:          Times to extract even if they fall on the same frame as another.
+    :return:                    An iterator of encoded frames, in ascending time order.
+    """
+    with VideoFileClip(video_filename, audio=False) as video_clip:
+        # Now the frame-rate is known, extract each frame only once
+        times = snap_to_frames(times, video_clip.reader.fps, keep_times).tolist()
+
+        for time, frame in read_frames_in_order(video_clip.reader, times, max_skip_frames):
+            yield time, encode_frame(frame, frame_format, frame_quality), (frame.shape[1], frame.shape[0])
+
+
+def get_frame_rate(video_filename: str) -> float:
+    """
+    Gets the frame-rate of a video, by probing it with FFMPEG (without decoding any frames).
+
+    :param video_filename:  The video file on disk.
+    :return:                The frame-rate of the video.
+    """
+    return probe_video(video_filename)[0]
+
+
+def probe_video(video_filename: str) -> Tuple[float, Tuple[int, int], float]:
+    """
+    Gets the properties of a video, by probing it with FFMPEG (without decoding any frames).
+
+    :param video_filename:  The video file on disk.
+    :return:                The frame-rate, (width, height) dimensions and length (in seconds) of the video.
+    """
+    infos = ffmpeg_parse_infos(video_filename)
+
+    return infos['video_fps'], tuple(infos['video_size']), infos['duration']
@@ -0,0 +1,99 @@
+import math
+from fractions import Fraction
+from typing import Collection, Iterable
+
+import numpy as np
+
+
+def times_on_grid(start: Fraction, step: Fraction, count: int) -> np.ndarray:
+    """
+    Gets the times start, start + step, ..., start + (count - 1) * step. Each time
+    is calculated exactly from its index (in integer arithmetic, over the common
+    denominator of the start and step) and only then rounded to a float, so no
+    error accumulates along the grid.
+
+    :param start:   The first time.
+    :param step:    The interval between times (may be negative).
+    :param count:   The number of times.
+    :return:        The times, as an array.
+    """
+    if count <= 0:
+        return np.empty(0, dtype=np.float64)
+
+    denominator = start.denominator * step.denominator // math.gcd(start.denominator, step.denominator)
+    start_numerator = start.numerator * (denominator // start.denominator)
+    step_numerator = step.numerator * (denominator // step.denominator)
+
+    # Dividing in floating-point is only exact if the numerators and denominator are
+    # exactly representable as floats. Otherwise (e.g. for times offset from a video's
+    # length, which has the large denominator of a float) divide Python integers, which
+    # rounds correctly however large they are
+    if abs(start_numerator) + abs(step_numerator) * count < 2 ** 53 and denominator < 2 ** 53:
+        indices = np.arange(count, dtype=np.int64)
+        return (start_numerator + step_numerator * indices) / denominator
+
+    return np.fromiter(
+        ((start_numerator + step_numerator * index) / denominator for index in range(count)),
+        dtype=np.float64,
+        count=count
+    )
+
+
+def plan_extraction_times(time_arrays: Iterable[Iterable[float]]) -> np.ndarray:
+    """
+    Merges several sets of times of frames to extract from a video into a single
+    schedule, sorted and without duplicates.
+
+    :param time_arrays:     The sets of times to merge.
+    :return:                The schedule of frame-times.
+    """
+    arrays = [
+        np.asarray(times if isinstance(times, np.ndarray) else list(times), dtype=np.float64)
+        for times in time_arrays
+    ]
+
+    if len(arrays) == 0:
+        return np.empty(0, dtype=np.float64)
+
+    # Unique also sorts the times
+    return np.unique(np.concatenate(arrays))
+
+
+def frame_indices(times: np.ndarray, fps: float) -> np.ndarray:
+    """
+    Gets the (0-based) indices of the frames of a video shown at the given times,
+    rounding the same way moviepy does.
+
+    :param times:   The times (in seconds).
+    :param fps:     The frame-rate of the video.
+    :return:        The frame indices.
+    """
+    return np.floor(fps * times + 0.00001).astype(np.int64)
+
+
+def snap_to_frames(times: Iterable[float], fps: float, keep_times: Collection[float] = ()) -> np.ndarray:
+    """
+    Reduces a schedule of frame-times to one time per frame of the video, so that
+    nearly-identical times don't extract the same frame more than once. Where several
+    times fall on the same frame, the earliest is kept, unless any of them are in
+    'keep_times' (e.g. the times of labelled frames, which are matched to their
+    annotations by time), in which case just those are kept.
+
+    :param times:       The frame-times to extract.
+    :param fps:         The frame-rate of the video.
+    :param keep_times:  The frame-times which must not be removed.
+    :return:            The reduced schedule, in ascending time order.
+    """
+    times = plan_extraction_times((times,))
+
+    if len(times) == 0:
+        return times
+
+    frames = frame_indices(times, fps)
+    keep = np.isin(times, np.fromiter(keep_times, dtype=np.float64, count=len(keep_times)))
+
+    # The times are sorted, so the first index of each frame is its earliest time
+    earliest = np.zeros(len(times), dtype=bool)
+    earliest[np.unique(frames, return_index=True)[1]] = True
+
+    return times[keep | (earliest & ~np.isin(frames, frames[keep]))]
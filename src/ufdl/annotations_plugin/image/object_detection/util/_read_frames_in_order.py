@@ -0,0 +1,43 @@
+from typing import Iterable, Iterator, Tuple
+
+import numpy as np
+from moviepy.video.io.ffmpeg_reader import FFMPEG_VideoReader
+
+
+def read_frames_in_order(
+        reader: FFMPEG_VideoReader,
+        times: Iterable[float],
+        max_skip_frames: int
+) -> Iterator[Tuple[float, np.ndarray]]:
+    """
+    Reads the frames of a video at the given times, in time order. The video is
+    decoded in a single forward pass, reading through the frames between requested
+    times and only seeking (which restarts FFMPEG from the previous keyframe) when
+    the gap to the next requested frame is larger than 'max_skip_frames'.
+
+    :param reader:              The FFMPEG reader for the video.
+    :param times:               The times (in seconds) of the frames to read.
+    :param max_skip_frames:     The largest gap (in frames) to read through rather than seek.
+    :return:                    An iterator of (time, frame) pairs, in ascending time order.
+    """
+    for time in sorted(times):
+        # Get the (1-based) position of the frame in the video, the same way moviepy does
+        position = int(reader.fps * time + 0.00001) + 1
+
+        # Same frame as was last read (reader.lastread is set by read_frame)
+        if reader.proc is not None and position == reader.pos:
+            frame = reader.lastread
+
+        # Seek if the reader is closed or the frame is too far ahead to read through
+        elif reader.proc is None or position < reader.pos or position > reader.pos + max_skip_frames:
+            reader.initialize(time)
+            reader.pos = position
+            frame = reader.read_frame()
+
+        # Otherwise decode forward to the requested frame
+        else:
+            reader.skip_frames(position - reader.pos - 1)
+            frame = reader.read_frame()
+            reader.pos = position
+
+        yield time, frame
@@ -17,6 +17,9 @@ class UFDLSpectrumClassificationReader(UFDLReader[SpectrumClassificationInstance
     """
     Reader which reads spectrum classification annotations from a UFDL server.
     """
+    # Spectra are parsed when they are created, so their files are always downloaded up front
+    SUPPORTS_LAZY_DATA: bool = False
+
     # Caches the categories file for each dataset so it need only be retrieved once
     category_cache: Dict[int, CategoriesFile] = ProcessState(lambda self: {})
 
@@ -32,7 +35,8 @@ class UFDLSpectrumClassificationReader(UFDLReader[SpectrumClassificationInstance
 
         # Download the categories for this data-set if we haven't already
         if pk not in category_cache:
-            category_cache[pk] = CategoriesFile.from_raw_json(dataset.get_categories(self.ufdl_context, pk))
+            with self.perf.timed("get_categories"):
+                category_cache[pk] = CategoriesFile.from_raw_json(dataset.get_categories(self.ufdl_context, pk))
 
         # Get the category file for this dataset from the cache
         category_file = category_cache[pk]
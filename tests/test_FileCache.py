@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+
+from ufdl.annotations_plugin.common.util import FileCache
+
+
+class TestFileCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = FileCache(self.directory.name, 100)
+        self.time = 1000000000
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def put(self, key: str, size: int, **kwargs) -> str:
+        path = self.cache.put(key, [b"x" * size], **kwargs)
+
+        # Give each file a distinct use-time, so the LRU order doesn't depend on timestamp resolution
+        self.time += 1
+        os.utime(path, (self.time, self.time))
+
+        return path
+
+    def test_get_returns_cached_contents(self):
+        self.put("a", 10)
+
+        with open(self.cache.get("a"), "rb") as file:
+            self.assertEqual(file.read(), b"x" * 10)
+
+        self.assertIsNone(self.cache.get("b"))
+
+    def test_evicts_least_recently_used(self):
+        self.put("a", 40)
+        self.put("b", 40)
+        self.put("c", 40)
+
+        self.assertIsNone(self.cache.get("a"))
+        self.assertIsNotNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("c"))
+
+    def test_never_evicts_the_file_just_added(self):
+        self.put("a", 40)
+        self.put("b", 150)
+
+        self.assertIsNone(self.cache.get("a"))
+        self.assertIsNotNone(self.cache.get("b"))
+
+    def test_never_evicts_pinned_files(self):
+        self.put("a", 40, pin=True)
+        self.put("b", 40)
+        self.put("c", 40)
+
+        self.assertIsNotNone(self.cache.get("a"))
+        self.assertIsNone(self.cache.get("b"))
+
+        # Once unpinned, the file can be evicted again
+        self.cache.unpin("a")
+        self.time = 0
+        os.utime(self.cache.get("a"), (self.time, self.time))
+        self.put("d", 40)
+
+        self.assertIsNone(self.cache.get("a"))
+
+    def test_size_persists_between_instances(self):
+        self.put("a", 40)
+        self.put("b", 40)
+
+        self.cache = FileCache(self.directory.name, 100)
+        self.put("c", 40)
+
+        self.assertIsNone(self.cache.get("a"))
+        self.assertIsNotNone(self.cache.get("c"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import io
+import unittest
+
+from PIL import Image as PILImage
+
+from wai.annotations.domain.image import ImageFormat
+
+from ufdl.annotations_plugin.common.util import LazyImage
+
+
+def make_png(width: int, height: int) -> bytes:
+    buffer = io.BytesIO()
+    PILImage.new("RGB", (width, height)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class TestLazyImage(unittest.TestCase):
+    def setUp(self):
+        self.fetch_count = 0
+
+    def fetch(self) -> bytes:
+        self.fetch_count += 1
+        return make_png(4, 3)
+
+    def test_creating_without_size_does_not_fetch(self):
+        LazyImage(self.fetch, "image.png", None, ImageFormat.PNG, None)
+
+        self.assertEqual(self.fetch_count, 0)
+
+    def test_size_is_determined_from_data_when_accessed(self):
+        image = LazyImage(self.fetch, "image.png", None, ImageFormat.PNG, None)
+
+        self.assertEqual(image.size, (4, 3))
+        self.assertEqual((image.width, image.height), (4, 3))
+        self.assertEqual(self.fetch_count, 1)
+
+    def test_given_size_does_not_fetch(self):
+        image = LazyImage(self.fetch, "image.png", None, ImageFormat.PNG, (10, 20))
+
+        self.assertEqual(image.size, (10, 20))
+        self.assertEqual(self.fetch_count, 0)
+
+    def test_data_is_fetched_once(self):
+        image = LazyImage(self.fetch, "image.png", None, ImageFormat.PNG, None)
+
+        self.assertEqual(image.data, make_png(4, 3))
+        self.assertEqual(image.data, make_png(4, 3))
+        self.assertEqual(self.fetch_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
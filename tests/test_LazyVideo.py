@@ -0,0 +1,57 @@
+import gc
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from moviepy.video.VideoClip import VideoClip
+
+from wai.annotations.domain.image import ImageFormat
+
+from ufdl.annotations_plugin.common.util import SpooledFile
+from ufdl.annotations_plugin.image.object_detection.util import LazyVideo
+
+
+class TestLazyVideo(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.video_path = os.path.join(self.directory.name, "video.mp4")
+        VideoClip(lambda t: np.full((16, 16, 3), int(t * 100), dtype=np.uint8), duration=1.0).write_videofile(
+            self.video_path, fps=10, codec="libx264", audio=False, logger=None
+        )
+        self.closed_count = 0
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def fetch_file(self) -> SpooledFile:
+        # Spool a copy of the video, as a download would
+        self.spooled_path = os.path.join(self.directory.name, "spooled.mp4")
+        shutil.copyfile(self.video_path, self.spooled_path)
+        return SpooledFile(self.spooled_path, on_close=self.on_close)
+
+    def on_close(self):
+        self.closed_count += 1
+
+    def test_does_not_fetch_until_a_frame_is_required(self):
+        LazyVideo(self.fetch_file, 100, ImageFormat.PNG, 95)
+
+        self.assertEqual(self.closed_count, 0)
+        self.assertFalse(hasattr(self, "spooled_path"))
+
+    def test_spooled_file_is_released_with_the_video(self):
+        video = LazyVideo(self.fetch_file, 100, ImageFormat.PNG, 95)
+        self.assertGreater(len(video.get_frame(0.0)), 0)
+        self.assertGreater(len(video.get_frame(0.5)), 0)
+        self.assertTrue(os.path.exists(self.spooled_path))
+
+        del video
+        gc.collect()
+
+        self.assertEqual(self.closed_count, 1)
+        self.assertFalse(os.path.exists(self.spooled_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
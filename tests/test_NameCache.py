@@ -0,0 +1,51 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from ufdl.annotations_plugin.common.util import NameCache
+
+
+class TestNameCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "names.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        NameCache(self.path).put("team|a", 1)
+
+        self.assertEqual(NameCache(self.path).get("team|a", 60), 1)
+        self.assertIsNone(NameCache(self.path).get("team|b", 60))
+
+    def test_entries_expire(self):
+        cache = NameCache(self.path)
+        cache.put("team|a", 1)
+
+        self.assertEqual(cache.get("team|a", 60), 1)
+
+        with mock.patch.object(time, "time", return_value=time.time() + 61):
+            self.assertIsNone(cache.get("team|a", 60))
+
+    def test_invalidate_removes_keys_with_prefix(self):
+        cache = NameCache(self.path)
+        cache.put("dataset|1|a|1", 1)
+        cache.put("dataset|1|a|None", 1)
+        cache.put("dataset|1|b|None", 2)
+
+        cache.invalidate("dataset|1|a|")
+
+        self.assertIsNone(cache.get("dataset|1|a|1", 60))
+        self.assertIsNone(cache.get("dataset|1|a|None", 60))
+        self.assertEqual(cache.get("dataset|1|b|None", 60), 2)
+        self.assertIsNone(NameCache(self.path).get("dataset|1|a|1", 60))
+
+    def test_open_shares_caches_by_path(self):
+        self.assertIs(NameCache.open(self.path), NameCache.open(os.path.relpath(self.path)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import json
+import os
+import tempfile
+import unittest
+
+from ufdl.annotations_plugin.common.util import PerfRecorder
+
+
+class TestPerfRecorder(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def record(self) -> PerfRecorder:
+        recorder = PerfRecorder(True)
+        recorder.record("get_file", 0.5, 100)
+        recorder.record("get_file", 1.5, 300)
+        return recorder
+
+    def test_disabled_recorder_records_nothing(self):
+        recorder = PerfRecorder(False)
+        with recorder.timed("get_file"):
+            pass
+        recorder.record("get_file", 1.0)
+
+        self.assertEqual(recorder.to_json(), {})
+
+    def test_components_writing_the_same_json_file_are_merged(self):
+        path = os.path.join(self.directory.name, "perf.json")
+        self.record().write(path, "Reader")
+        self.record().write(path, "Writer")
+
+        with open(path, "r") as file:
+            report = json.load(file)
+
+        self.assertEqual(set(report["components"]), {"Reader", "Writer"})
+        self.assertEqual(
+            report["components"]["Writer"]["get_file"],
+            {"count": 2, "total_seconds": 2.0, "mean_seconds": 1.0, "max_seconds": 1.5, "bytes": 400}
+        )
+
+    def test_components_writing_the_same_prometheus_file_are_merged(self):
+        path = os.path.join(self.directory.name, "perf.prom")
+        self.record().write(path, "Reader")
+        self.record().write(path, "Writer")
+
+        with open(path, "r") as file:
+            report = file.read()
+
+        self.assertIn('ufdl_annotations_operations_total{component="Reader",operation="get_file"} 2', report)
+        self.assertIn('ufdl_annotations_operations_total{component="Writer",operation="get_file"} 2', report)
+        self.assertEqual(report.count("# TYPE ufdl_annotations_operations_total"), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+
+from ufdl.annotations_plugin.common.util import ReadCheckpoint
+
+
+class TestReadCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "checkpoint.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        checkpoint = ReadCheckpoint(self.path)
+        checkpoint.complete_file("dataset-1", 2, "a.jpg")
+        checkpoint.complete_frame("dataset-2", 1, "video.mp4", 1.5)
+        checkpoint.save()
+
+        reloaded = ReadCheckpoint(self.path)
+
+        self.assertEqual(reloaded.get_last_file("dataset-1", 2), "a.jpg")
+        self.assertIsNone(reloaded.get_last_file("dataset-2", 1))
+        self.assertEqual(reloaded.get_last_frame_time("dataset-2", 1, "video.mp4"), 1.5)
+        self.assertIsNone(reloaded.get_last_frame_time("dataset-2", 1, "other.mp4"))
+
+    def test_ignores_progress_through_other_versions(self):
+        checkpoint = ReadCheckpoint(self.path)
+        checkpoint.complete_file("dataset", 1, "a.jpg")
+        checkpoint.complete_frame("dataset", 1, "video.mp4", 2.0)
+
+        self.assertIsNone(checkpoint.get_last_file("dataset", 2))
+        self.assertIsNone(checkpoint.get_last_frame_time("dataset", 2, "video.mp4"))
+
+    def test_completing_a_file_clears_the_partial_video(self):
+        checkpoint = ReadCheckpoint(self.path)
+        checkpoint.complete_frame("dataset", 1, "video.mp4", 2.0)
+        checkpoint.complete_file("dataset", 1, "video.mp4")
+
+        self.assertEqual(checkpoint.get_last_file("dataset", 1), "video.mp4")
+        self.assertIsNone(checkpoint.get_last_frame_time("dataset", 1, "video.mp4"))
+
+    def test_save_leaves_no_temporary_files(self):
+        checkpoint = ReadCheckpoint(self.path)
+        checkpoint.complete_file("dataset", 1, "a.jpg")
+        checkpoint.save()
+
+        self.assertEqual(os.listdir(self.directory.name), ["checkpoint.json"])
+
+
+if __name__ == '__main__':
+    unittest.main()
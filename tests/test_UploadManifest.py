@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+
+from ufdl.annotations_plugin.common.util import UploadManifest
+
+
+class TestUploadManifest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "manifest.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        manifest = UploadManifest(self.path)
+        manifest.record("dataset", "a.jpg", "content-1", "annotations-1")
+        manifest.record("dataset", "b.jpg", "content-2", "annotations-2")
+        manifest.record("dataset", "a.jpg", "content-3", "annotations-3")
+        manifest.close()
+
+        reloaded = UploadManifest(self.path)
+        try:
+            self.assertEqual(reloaded.get("dataset", "a.jpg"), ("content-3", "annotations-3"))
+            self.assertEqual(reloaded.get("dataset", "b.jpg"), ("content-2", "annotations-2"))
+            self.assertIsNone(reloaded.get("other", "a.jpg"))
+        finally:
+            reloaded.close()
+
+    def test_ignores_partially_written_final_line(self):
+        manifest = UploadManifest(self.path)
+        manifest.record("dataset", "a.jpg", "content-1", "annotations-1")
+        manifest.close()
+
+        # Simulate an upload interrupted while writing an entry
+        with open(self.path, "a") as file:
+            file.write('{"dataset": "dataset", "fi')
+
+        manifest = UploadManifest(self.path)
+        manifest.record("dataset", "b.jpg", "content-2", "annotations-2")
+        manifest.close()
+
+        reloaded = UploadManifest(self.path)
+        try:
+            self.assertEqual(reloaded.get("dataset", "a.jpg"), ("content-1", "annotations-1"))
+            self.assertEqual(reloaded.get("dataset", "b.jpg"), ("content-2", "annotations-2"))
+        finally:
+            reloaded.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
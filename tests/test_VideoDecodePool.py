@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from moviepy.video.VideoClip import VideoClip
+
+from wai.annotations.domain.image import ImageFormat
+
+from ufdl.annotations_plugin.image.object_detection.util import VideoDecodePool
+
+
+class TestVideoDecodePool(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.video_path = os.path.join(self.directory.name, "video.mp4")
+        VideoClip(lambda t: np.full((16, 16, 3), int(t * 100), dtype=np.uint8), duration=1.0).write_videofile(
+            self.video_path, fps=10, codec="libx264", audio=False, logger=None
+        )
+        self.pool = VideoDecodePool(1)
+
+    def tearDown(self):
+        self.pool.shutdown()
+        self.directory.cleanup()
+
+    def submit(self):
+        return self.pool.submit(self.video_path, [0.0, 0.5], 0, ImageFormat.PNG, 95)
+
+    def test_decodes_videos_in_order(self):
+        first, second = self.submit(), self.submit()
+
+        self.assertEqual([frame[0] for frame in first], [0.0, 0.5])
+        self.assertEqual([frame[0] for frame in second], [0.0, 0.5])
+
+    def test_shutdown_cancels_videos_which_have_not_started(self):
+        decoding = [self.submit() for _ in range(8)]
+
+        for frames in decoding:
+            frames.close()
+        self.pool.shutdown()
+
+        self.assertTrue(any(future.cancelled() for future in self.pool._futures))
+
+
+if __name__ == '__main__':
+    unittest.main()
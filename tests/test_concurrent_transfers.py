@@ -0,0 +1,104 @@
+"""
+Converts datasets between readers and writers using concurrent downloads and
+uploads, against the mock UFDL server from the benchmarks.
+"""
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from run_benchmarks import run_benchmark
+
+from ufdl.annotations_plugin.common.component import UFDLReader
+
+# The options enabling concurrent transfers
+READER_ARGS = ["--download-workers", "4"]
+WRITER_ARGS = ["--upload-workers", "4"]
+
+# The number of files in each converted dataset
+NUM_FILES = 20
+
+
+class TestConcurrentTransfers(unittest.TestCase):
+    def convert(self, domain: str, num_files: int = NUM_FILES, reader_args=(), writer_args=()):
+        _, server = run_benchmark(
+            domain, num_files, 1024, 0.001, None, [*READER_ARGS, *reader_args], [*WRITER_ARGS, *writer_args]
+        )
+        return server.find_dataset("source"), server.find_dataset("target")
+
+    def test_image_classification(self):
+        source, target = self.convert("ic")
+
+        self.assertEqual(target.files, source.files)
+        self.assertEqual(target.categories, source.categories)
+
+    def test_object_detection(self):
+        source, target = self.convert("od")
+
+        self.assertEqual(target.files, source.files)
+        self.assertEqual(target.file_types, source.file_types)
+        self.assertEqual(
+            {filename: [annotation["label"] for annotation in annotations]
+             for filename, annotations in target.annotations.items()},
+            {filename: [annotation["label"] for annotation in annotations]
+             for filename, annotations in source.annotations.items()}
+        )
+
+    def test_object_detection_videos(self):
+        source, target = self.convert("od-video", 4, ["--video-decode-workers", "2"])
+
+        self.assertEqual(target.files, source.files)
+        self.assertEqual(
+            {filename: sorted(annotation["time"] for annotation in annotations)
+             for filename, annotations in target.annotations.items()},
+            {filename: sorted(annotation["time"] for annotation in annotations)
+             for filename, annotations in source.annotations.items()}
+        )
+
+    def test_object_detection_rejects_an_out_of_range_frame_quality(self):
+        for quality in ("0", "96"):
+            with self.subTest(quality=quality), self.assertRaisesRegex(Exception, "--frame-quality should be between 1 and 95"):
+                self.convert("od", reader_args=["--frame-quality", quality])
+
+    def test_speech(self):
+        source, target = self.convert("sp")
+
+        self.assertEqual(target.files, source.files)
+        self.assertEqual(target.transcriptions, source.transcriptions)
+
+    def test_spectrum_classification(self):
+        source, target = self.convert("sc")
+
+        self.assertEqual(target.files, source.files)
+        self.assertEqual(target.categories, source.categories)
+
+    def test_spectrum_classification_annotations_only(self):
+        # Spectra are parsed when they are created, so are still downloaded by the download workers
+        with mock.patch.object(
+                UFDLReader, "download_files", autospec=True, side_effect=UFDLReader.download_files
+        ) as download_files:
+            source, target = self.convert("sc", reader_args=["--annotations-only"])
+
+        download_files.assert_called_once()
+        self.assertEqual(target.files, source.files)
+        self.assertEqual(target.categories, source.categories)
+
+    def test_reader_and_writer_share_a_perf_report_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "perf.json")
+            self.convert("ic", reader_args=["--perf-report-file", path], writer_args=["--perf-report-file", path])
+
+            with open(path, "r") as file:
+                report = json.load(file)
+
+        self.assertEqual(set(report["components"]), {"UFDLImageClassificationReader", "UFDLImageClassificationWriter"})
+        self.assertEqual(report["components"]["UFDLImageClassificationReader"]["get_file"]["count"], NUM_FILES)
+        self.assertEqual(report["components"]["UFDLImageClassificationWriter"]["add_file"]["count"], NUM_FILES)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from ufdl.annotations_plugin.common.util import ordered_map
+
+
+class TestOrderedMap(unittest.TestCase):
+    def test_results_are_in_item_order(self):
+        # Later items finish first
+        def delayed_square(item: int) -> int:
+            time.sleep((10 - item) * 0.002)
+            return item * item
+
+        with ThreadPoolExecutor(4) as executor:
+            results = list(ordered_map(delayed_square, range(10), executor, 4))
+
+        self.assertEqual(results, [item * item for item in range(10)])
+
+    def test_window_bounds_calls_in_flight(self):
+        lock = threading.Lock()
+        in_flight = 0
+        max_in_flight = 0
+
+        def track(item: int) -> int:
+            nonlocal in_flight, max_in_flight
+            with lock:
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+            time.sleep(0.005)
+            with lock:
+                in_flight -= 1
+            return item
+
+        with ThreadPoolExecutor(8) as executor:
+            results = list(ordered_map(track, range(20), executor, 3))
+
+        self.assertEqual(results, list(range(20)))
+        self.assertLessEqual(max_in_flight, 3)
+
+    def test_stopping_early_cancels_pending_calls(self):
+        started = []
+        release = threading.Event()
+
+        def blocking(item: int) -> int:
+            started.append(item)
+            release.wait()
+            return item
+
+        with ThreadPoolExecutor(1) as executor:
+            results = ordered_map(blocking, range(10), executor, 5)
+            release.set()
+            self.assertEqual(next(results), 0)
+            results.close()
+
+        # Only the items started before closing were called
+        self.assertLess(len(started), 10)
+
+    def test_exceptions_are_raised_in_order(self):
+        def fail_on_three(item: int) -> int:
+            if item == 3:
+                raise ValueError(item)
+            return item
+
+        with ThreadPoolExecutor(4) as executor:
+            results = ordered_map(fail_on_three, range(10), executor, 4)
+
+            self.assertEqual([next(results) for _ in range(3)], [0, 1, 2])
+            with self.assertRaises(ValueError):
+                next(results)
+
+
+if __name__ == '__main__':
+    unittest.main()
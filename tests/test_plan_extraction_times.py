@@ -0,0 +1,62 @@
+import unittest
+from fractions import Fraction
+
+import numpy as np
+
+from ufdl.annotations_plugin.image.object_detection.util import (
+    frame_indices,
+    plan_extraction_times,
+    snap_to_frames,
+    times_on_grid
+)
+
+
+class TestTimesOnGrid(unittest.TestCase):
+    def test_times_are_exact(self):
+        times = times_on_grid(Fraction(0), Fraction(1, 10), 1000)
+
+        self.assertEqual(times[999], 99.9)
+        self.assertTrue(np.array_equal(times, [index / 10 for index in range(1000)]))
+
+    def test_negative_step(self):
+        self.assertEqual(list(times_on_grid(Fraction(1), Fraction(-1, 4), 3)), [1.0, 0.75, 0.5])
+
+    def test_no_times(self):
+        self.assertEqual(len(times_on_grid(Fraction(0), Fraction(1), 0)), 0)
+
+    def test_large_denominators(self):
+        start = Fraction(12.3456789)
+        times = times_on_grid(start, Fraction(1, 3), 4)
+
+        self.assertEqual(list(times), [float(start + Fraction(index, 3)) for index in range(4)])
+
+
+class TestPlanExtractionTimes(unittest.TestCase):
+    def test_merges_sorts_and_deduplicates(self):
+        times = plan_extraction_times([[3.0, 1.0], np.array([2.0, 1.0]), (time for time in [0.5])])
+
+        self.assertEqual(list(times), [0.5, 1.0, 2.0, 3.0])
+
+    def test_no_time_arrays(self):
+        self.assertEqual(len(plan_extraction_times([])), 0)
+
+
+class TestSnapToFrames(unittest.TestCase):
+    def test_frame_indices(self):
+        self.assertEqual(list(frame_indices(np.array([0.0, 0.1, 0.19, 0.2]), 10.0)), [0, 1, 1, 2])
+
+    def test_keeps_earliest_time_per_frame(self):
+        self.assertEqual(list(snap_to_frames([0.0, 0.15, 0.11, 0.2], 10.0)), [0.0, 0.11, 0.2])
+
+    def test_keeps_labelled_times(self):
+        self.assertEqual(list(snap_to_frames([0.11, 0.15, 0.2], 10.0, [0.15])), [0.15, 0.2])
+
+    def test_keeps_all_labelled_times_on_a_frame(self):
+        self.assertEqual(list(snap_to_frames([0.11, 0.13, 0.15], 10.0, [0.13, 0.15])), [0.13, 0.15])
+
+    def test_no_times(self):
+        self.assertEqual(len(snap_to_frames([], 10.0)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+"""
+Writes the same dataset twice through the mock UFDL server from the benchmarks,
+checking that the second write skips the files recorded in the sync manifest.
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from wai.annotations.main import main as wai_annotations_main
+
+from mock_ufdl import MockUFDLServer
+from run_benchmarks import SERVER_OPTIONS, seed_ic
+
+
+class TestSyncManifest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.manifest = os.path.join(self.directory.name, "manifest.jsonl")
+        self.server = MockUFDLServer().install()
+        seed_ic(self.server.add_dataset("source"), 10, 1024)
+
+    def tearDown(self):
+        self.server.uninstall()
+        self.directory.cleanup()
+
+    def write(self, *writer_args: str):
+        wai_annotations_main([
+            "convert",
+            "from-ufdl-ic", *SERVER_OPTIONS, "--datasets", "name:source",
+            "to-ufdl-ic", *SERVER_OPTIONS, "--dataset", "target", "--licence", "test",
+            "--sync-manifest", self.manifest, *writer_args
+        ])
+
+    def test_skips_unchanged_files_in_copied_dataset(self):
+        self.write()
+        self.assertEqual(self.server.request_counts["add_file"], 10)
+
+        # By default, writing to an existing dataset writes to a new version copied from it
+        self.write()
+        target = self.server.find_dataset("target")
+
+        self.assertEqual(target.version, 2)
+        self.assertEqual(self.server.request_counts["add_file"], 10)
+        self.assertEqual(len(target.files), 10)
+
+    def test_uploads_changed_files(self):
+        self.write()
+
+        self.server.find_dataset("source").files["image-3.jpg"] += b"changed"
+        self.write("--on-existing", "overwrite")
+
+        self.assertEqual(self.server.request_counts["add_file"], 11)
+
+
+if __name__ == '__main__':
+    unittest.main()